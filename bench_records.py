@@ -0,0 +1,65 @@
+import argparse
+import csv
+import io
+import sys
+import time
+import tracemalloc
+
+from ucc_records import FIELDNAMES, FilingRecord
+
+# Compares output rows built as dicts (csv.DictWriter, the worker's format
+# before FilingRecord) with FilingRecord tuples (csv.writer): memory held by
+# N live rows, as tracemalloc peak, and the time to build and write them.
+
+
+def filing_values(i):
+    values = [f"COMPANY {i} LLC", "0.93", "Filed", "01/02/2020", "01/02/2025", "12/31/2024",
+              f"2020{i:08d}", "1", "1"]
+    values += ["STUB BANK", "1 MAIN ST, MIAMI, FL 33101"] + ["", ""] * 4
+    values += ["1", f"COMPANY {i} LLC", "2 OCEAN DR, MIAMI, FL 33139", "Financing Statement", "2"]
+    return values
+
+
+def as_dict(i):
+    return dict(zip(FIELDNAMES, filing_values(i)))
+
+
+def as_record(i):
+    return FilingRecord(filing_values(i))
+
+
+def measure(build, rows):
+    # Timed untraced; tracemalloc slows allocation-heavy code unevenly
+    start = time.perf_counter()
+    held = [build(i) for i in range(rows)]
+    built = time.perf_counter() - start
+    del held
+
+    tracemalloc.start()
+    held = [build(i) for i in range(rows)]
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    buf = io.StringIO()
+    start = time.perf_counter()
+    if isinstance(held[0], dict):
+        writer = csv.DictWriter(buf, fieldnames=FIELDNAMES)
+    else:
+        writer = csv.writer(buf)
+    writer.writerows(held)
+    written = time.perf_counter() - start
+    return peak, built, written, buf.getvalue()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory and CPU of dict rows vs FilingRecord")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows built and written")
+    args = parser.parse_args()
+
+    results = {name: measure(build, args.rows) for name, build in (("dict", as_dict), ("FilingRecord", as_record))}
+    for name, (peak, built, written, _) in results.items():
+        print(f"{name:>12}: peak {peak / 2**20:6.1f} MiB ({peak / args.rows:5.0f} B/row), "
+              f"build {built / args.rows * 1e6:4.2f} us/row, write {written / args.rows * 1e6:4.2f} us/row")
+    same = results["dict"][3] == results["FilingRecord"][3]
+    print(f"identical CSV: {same}")
+    sys.exit(0 if same else 1)
@@ -2,6 +2,9 @@ import os
 import json
 import re
 import shutil
+import hub_snapshots
+import ucc_aggregates
+from hub_layout import classify_csv
 
 def generate_manifest():
     """Generates a manifest.json file for the frontend to index all available data files."""
@@ -19,6 +22,15 @@ def generate_manifest():
         print(f"Directory {base_dir} does not exist and no {source_data} found.")
         return
 
+    # Precompiled, schema-normalized copies of each hub; rebuilt only when the
+    # CSV or hub_mappings.json changed
+    snapshot_config = None
+    snapshot_index = {}
+    if os.path.exists(source_data) and os.path.exists(hub_snapshots.MAPPINGS_FILE):
+        snapshot_config = hub_snapshots.load_mappings()
+        snapshot_index = hub_snapshots.load_index()
+    snapshot_sources = []
+
     for root, dirs, files in os.walk(base_dir):
         for file in files:
             filepath = os.path.join(root, file)
@@ -27,38 +39,29 @@ def generate_manifest():
             
             # Relative to Data/ base to extract Type and Zip
             rel_to_base = os.path.relpath(root, base_dir)
-            parts = rel_to_base.split(os.sep)
 
             if file.endswith('.csv'):
-                # Resolve data_type: use directory name, or "YP" if file starts with it, else "General"
-                data_type = "General"
-                zip_code = ""
-
-                if len(parts) > 0 and parts[0] != '.':
-                    data_type = parts[0]
-                    if re.match(r'^\d{5}$', data_type):
-                        zip_code = data_type
-                elif file.startswith("YP "):
-                    data_type = "YP"
-                
-                if len(parts) > 1:
-                    zip_code = parts[1]
-
-                # Extract location from filename if possible
-                location = ""
-                name_match = re.search(r'Lookup\s+(.*?)\s+-', file)
-                if name_match:
-                    location = name_match.group(1)
-                else:
-                    location = file.replace('.csv', '').replace('YP Phone Number Lookup ', '')
+                data_type, zip_code, location = classify_csv(rel_to_base, file)
 
-                manifest.append({
+                entry = {
                     "path": relative_path,
                     "type": data_type,
                     "zip": zip_code,
                     "location": location,
                     "filename": file
-                })
+                }
+
+                if snapshot_config is not None:
+                    source_path = os.path.join(source_data, os.path.relpath(filepath, base_dir))
+                    try:
+                        entry["snapshot"] = hub_snapshots.ensure_snapshot(
+                            source_path, data_type, zip_code, location, snapshot_config, snapshot_index
+                        )
+                        snapshot_sources.append(source_path)
+                    except (OSError, ValueError) as e:
+                        print(f"Error building snapshot for {source_path}: {e}")
+
+                manifest.append(entry)
 
             elif file.endswith('.json'):
                 manifest.append({
@@ -91,6 +94,20 @@ def generate_manifest():
 
     manifest.sort(key=sort_key)
 
+    if snapshot_config is not None:
+        hub_snapshots.prune_snapshots(snapshot_index, snapshot_sources)
+        hub_snapshots.save_index(snapshot_index)
+
+    # Materialized dashboard counts; only hub files that changed are rescanned
+    if os.path.exists(source_data):
+        ucc_aggregates.refresh_aggregates()
+        manifest.append({
+            "path": os.path.relpath(ucc_aggregates.AGGREGATES_FILE, 'public'),
+            "type": "JSON",
+            "category": "Aggregates",
+            "filename": os.path.basename(ucc_aggregates.AGGREGATES_FILE)
+        })
+
     with open('public/manifest.json', 'w') as f:
         json.dump(manifest, f, indent=2)
 
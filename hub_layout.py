@@ -0,0 +1,31 @@
+import os
+import re
+
+
+def classify_csv(rel_dir, file):
+    """Resolves (type, zip, location) for a CSV from its directory relative to Data/."""
+    parts = rel_dir.split(os.sep)
+
+    # Resolve data_type: use directory name, or "YP" if file starts with it, else "General"
+    data_type = "General"
+    zip_code = ""
+
+    if len(parts) > 0 and parts[0] != '.':
+        data_type = parts[0]
+        if re.match(r'^\d{5}$', data_type):
+            zip_code = data_type
+    elif file.startswith("YP "):
+        data_type = "YP"
+
+    if len(parts) > 1:
+        zip_code = parts[1]
+
+    # Extract location from filename if possible
+    location = ""
+    name_match = re.search(r'Lookup\s+(.*?)\s+-', file)
+    if name_match:
+        location = name_match.group(1)
+    else:
+        location = file.replace('.csv', '').replace('YP Phone Number Lookup ', '')
+
+    return data_type, zip_code, location
@@ -0,0 +1,291 @@
+import csv
+import hashlib
+import json
+import os
+import re
+
+MAPPINGS_FILE = "hub_mappings.json"
+SNAPSHOT_DIR = "public/snapshots"
+SNAPSHOT_INDEX = os.path.join(SNAPSHOT_DIR, "index.json")
+SNAPSHOT_VERSION = 1
+
+# Kept in step with applyHubMappings and its helpers in src/lib/dataService.ts,
+# which applies the same hub_mappings.json to hubs that have no snapshot
+VALLEY_REGEX = re.compile(r'valley', re.IGNORECASE)
+DOUBLE_SPACE_REGEX = re.compile(r'\s\s+')
+AMP_REGEX = re.compile(r'&amp;', re.IGNORECASE)
+PHONE_REGEX = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+DOCUMENT_NUMBER_REGEX = re.compile(r'^([A-Za-z]\d{5,}|\d{10,12})$')
+HEADERLESS_CELL_REGEX = re.compile(r'\d{3}\D\d{3}\D\d{4}|http|www\.')
+DATE_REGEX = re.compile(r'\d{1,2}/\d{1,2}/\d{2,4}')
+LEADING_DATE_REGEX = re.compile(r'^(\d{1,2})/(\d{1,2})/(\d{4})\b')
+ISO_DATE_REGEX = re.compile(r'^(\d{4})-(\d{2})-(\d{2})')
+
+
+def scrub_value(value):
+    if not value:
+        return value
+
+    if 'v' in value or 'V' in value:
+        lower_value = value.lower()
+        if 'valley' in lower_value:
+            if any(marker in lower_value for marker in ('http', 'www.', '.com', '.org', '.net')):
+                return 'https://www.google.com'
+            value = VALLEY_REGEX.sub('', value)
+
+    if '  ' in value:
+        value = DOUBLE_SPACE_REGEX.sub(' ', value)
+
+    value = value.strip()
+
+    if '&' in value:
+        value = AMP_REGEX.sub('&', value)
+    if '&#39;' in value:
+        value = value.replace('&#39;', "'")
+
+    return value
+
+
+def is_phone_number(value):
+    return bool(PHONE_REGEX.search(value.strip()))
+
+
+def normalize_date(value):
+    """Canonical MM/DD/YYYY, which is what the table's date sort recognises."""
+    match = LEADING_DATE_REGEX.match(value)
+    if match:
+        month, day, year = match.groups()
+        return f"{int(month):02d}/{int(day):02d}/{year}"
+    match = ISO_DATE_REGEX.match(value)
+    if match:
+        year, month, day = match.groups()
+        return f"{month}/{day}/{year}"
+    return value
+
+
+def normalize_phone(value):
+    digits = re.sub(r'\D', '', value)
+    if len(digits) == 11 and digits.startswith('1'):
+        digits = digits[1:]
+    if len(digits) == 10:
+        return f"({digits[:3]}) {digits[3:6]}-{digits[6:]}"
+    return value
+
+
+FIELD_NORMALIZERS = {"date": normalize_date, "phone": normalize_phone}
+
+
+def load_mappings(path=MAPPINGS_FILE):
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = f.read()
+    config = json.loads(raw)
+    config["hash"] = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    return config
+
+
+def rule_matches(when, file_type, col_count):
+    if "columns" in when and col_count != when["columns"]:
+        return False
+    if "min_columns" in when and col_count < when["min_columns"]:
+        return False
+    if "max_columns" in when and col_count > when["max_columns"]:
+        return False
+    if "type" in when and file_type != when["type"]:
+        return False
+    if "type_contains" in when and when["type_contains"] not in file_type:
+        return False
+    if "type_in" in when and file_type not in when["type_in"]:
+        return False
+    return True
+
+
+def select_rule(config, file_type, col_count):
+    for rule in config["rules"]:
+        if rule_matches(rule.get("when", {}), file_type, col_count):
+            return rule
+    return {"name": "Unmapped", "header": "auto_generic", "use_headers": True}
+
+
+def detect_gaps(first_row, mapping):
+    """Dynamic pattern matching for columns the rule left unmapped."""
+    assigned = set(mapping.values())
+    for idx, cell in enumerate(first_row):
+        val = (cell or '').strip()
+        if not val or idx in mapping:
+            continue
+
+        field = None
+        if DATE_REGEX.search(val):
+            field = 'Date Filed'
+        elif 'sunbiz.org' in val.lower():
+            mapping[idx] = 'Sunbiz Link'
+            continue
+        elif re.match(r'^(FILED|LAPSED)', val, re.IGNORECASE):
+            field = 'UCC Status'
+        elif re.match(r'^(ACTIVE|INACT|DISS|DELQ|UA)', val, re.IGNORECASE):
+            field = 'Sunbiz Status'
+        elif DOCUMENT_NUMBER_REGEX.match(val):
+            field = 'Document Number'
+        elif is_phone_number(val):
+            field = 'Phone'
+        elif re.match(r'^\d{2}-\d{7}$|^\d{9}$', val) and val != '000000000':
+            field = 'FEI/EIN Number'
+        elif idx == 1 and len(val) > 5 and not re.search(r'\d', val) and ',' not in val:
+            field = 'Category'
+
+        if field and field not in assigned:
+            mapping[idx] = field
+            assigned.add(field)
+
+
+def resolve_headers(rule, first_row):
+    """Returns (headers, skip_first_row) for a file's first non-empty row."""
+    header_mode = rule.get("header", False)
+    if header_mode == "auto":
+        skip = not any(HEADERLESS_CELL_REGEX.search(cell) for cell in first_row)
+    elif header_mode == "auto_generic":
+        skip = not any(
+            HEADERLESS_CELL_REGEX.search(cell) or (cell and len(cell) > 5 and cell.strip().isdigit())
+            for cell in first_row
+        )
+    else:
+        skip = bool(header_mode)
+
+    if rule.get("use_headers"):
+        headers = []
+        counts = {}
+        for i, h in enumerate(first_row):
+            name = scrub_value(h.strip()) if h and h.strip() else f"Column {i + 1}"
+            if rule.get("dedupe_headers"):
+                if name in counts:
+                    counts[name] += 1
+                    name = f"{name} ({counts[name]})"
+                else:
+                    counts[name] = 0
+            headers.append(name)
+        return headers, skip
+
+    mapping = {int(k): v for k, v in rule.get("columns", {}).items()}
+    for variant in rule.get("variants", []):
+        probe = variant["when_any_cell"]
+        if probe == "phone":
+            hit = any(is_phone_number(cell) for cell in first_row)
+        else:
+            hit = any(probe in cell.lower() for cell in first_row)
+        if hit:
+            mapping.update({int(k): v for k, v in variant["columns"].items()})
+            break
+    if mapping:
+        detect_gaps(first_row, mapping)
+    return [mapping.get(i, f"Column {i + 1}") for i in range(len(first_row))], skip
+
+
+def build_snapshot(path, file_type, zip_code, location, config):
+    """Parses one hub CSV into the compact column/row snapshot the UI loads."""
+    with open(path, 'r', encoding='utf-8', errors='ignore', newline='') as f:
+        data = [row for row in csv.reader(f) if any(cell.strip() for cell in row)]
+
+    if not data:
+        return {"version": SNAPSHOT_VERSION, "rule": None, "columns": [], "rows": []}
+
+    first_row = data[0]
+    rule = select_rule(config, file_type, len(first_row))
+    headers, skip = resolve_headers(rule, first_row)
+    body = data[1:] if skip else data
+
+    field_types = config.get("field_types", {})
+    value_maps = config.get("value_maps", {})
+    normalizers = [FIELD_NORMALIZERS.get(field_types.get(h)) for h in headers]
+    maps = [value_maps.get(h) for h in headers]
+    aliases = rule.get("aliases", {})
+    alias_sources = [(target, headers.index(source)) for target, source in aliases.items() if source in headers]
+
+    columns = list(headers) + [target for target, _ in alias_sources] + ["_zip", "_location"]
+    zip_idx = next((i for i, h in enumerate(headers) if h in ('Zip', 'ZIP')), None)
+    loc_idx = headers.index('Location') if 'Location' in headers else None
+    file_zip = scrub_value(zip_code or '')
+    file_loc = scrub_value(location or '')
+    width = len(headers)
+
+    rows = []
+    for raw in body:
+        row = []
+        for i in range(width):
+            value = scrub_value(raw[i]) if i < len(raw) else ''
+            if value:
+                if normalizers[i]:
+                    value = normalizers[i](value)
+                if maps[i]:
+                    value = maps[i].get(value, value)
+            row.append(value)
+        for _, source_idx in alias_sources:
+            row.append(row[source_idx])
+        row.append(file_zip or (row[zip_idx] if zip_idx is not None else ''))
+        row.append(file_loc or (row[loc_idx] if loc_idx is not None else ''))
+        rows.append(row)
+
+    for flt in config.get("filters", []):
+        if rule_matches(flt.get("when", {}), file_type, len(first_row)):
+            required = [columns.index(c) for c in flt["require_any"] if c in columns]
+            rows = [r for r in rows if any(r[i] for i in required)]
+
+    # Drop columns that are empty in every row; the UI hides them anyway
+    keep = [i for i, c in enumerate(columns) if c in ('_zip', '_location') or any(r[i] for r in rows)]
+    if len(keep) < len(columns):
+        columns = [columns[i] for i in keep]
+        rows = [[r[i] for i in keep] for r in rows]
+
+    return {"version": SNAPSHOT_VERSION, "rule": rule.get("name"), "columns": columns, "rows": rows}
+
+
+def load_index():
+    if os.path.exists(SNAPSHOT_INDEX):
+        try:
+            with open(SNAPSHOT_INDEX, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return {}
+
+
+def snapshot_path_for(source_path):
+    rel = os.path.relpath(source_path, "Data")
+    return os.path.join(SNAPSHOT_DIR, os.path.splitext(rel)[0] + ".json")
+
+
+def ensure_snapshot(source_path, file_type, zip_code, location, config, index):
+    """Rebuilds a hub's snapshot only when the CSV or the mapping config changed.
+    Returns the snapshot path relative to public/."""
+    st = os.stat(source_path)
+    out_path = snapshot_path_for(source_path)
+    fingerprint = [st.st_size, st.st_mtime_ns, config["hash"], SNAPSHOT_VERSION]
+    entry = index.get(source_path)
+
+    if not entry or entry["fingerprint"] != fingerprint or not os.path.exists(out_path):
+        snapshot = build_snapshot(source_path, file_type, zip_code, location, config)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        temp_file = out_path + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, separators=(',', ':'), ensure_ascii=False)
+        os.replace(temp_file, out_path)
+        index[source_path] = {"fingerprint": fingerprint, "rows": len(snapshot["rows"]), "rule": snapshot["rule"]}
+        print(f"Snapshot: {source_path} -> {out_path} ({len(snapshot['rows'])} rows, {snapshot['rule']})")
+
+    return os.path.relpath(out_path, 'public')
+
+
+def save_index(index):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    temp_file = SNAPSHOT_INDEX + ".tmp"
+    with open(temp_file, 'w') as f:
+        json.dump(index, f, indent=2)
+    os.replace(temp_file, SNAPSHOT_INDEX)
+
+
+def prune_snapshots(index, live_sources):
+    for source_path in set(index) - set(live_sources):
+        try:
+            os.remove(snapshot_path_for(source_path))
+        except OSError:
+            pass
+        del index[source_path]
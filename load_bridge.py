@@ -0,0 +1,98 @@
+import argparse
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+from verify_resume import scratch_copy
+
+# Polls a bridge endpoint from several concurrent clients and reports
+# throughput and latency. Without --url it serves ucc_bridge.py from a scratch
+# copy on waitress, as the bridge runs in production; point --url at another
+# bridge (e.g. an older checkout) to compare.
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve_bridge(threads):
+    work_dir = scratch_copy()
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", f"from waitress import serve; import ucc_bridge; "
+                               f"serve(ucc_bridge.app, host='127.0.0.1', port={port}, threads={threads})"],
+        cwd=work_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(f"{base}/health", timeout=1)
+            break
+        except requests.RequestException:
+            time.sleep(0.1)
+    return proc, work_dir, base
+
+
+def load(url, method, clients, seconds):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + seconds
+
+    def client():
+        session = requests.Session()
+        mine, failed = [], 0
+        while time.monotonic() < stop_at:
+            start = time.perf_counter()
+            try:
+                ok = session.request(method, url, json={} if method == "POST" else None, timeout=10).status_code < 500
+            except requests.RequestException:
+                ok = False
+            if ok:
+                mine.append(time.perf_counter() - start)
+            else:
+                failed += 1
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0
+    return len(latencies) / seconds, pct(0.5), pct(0.95), errors[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent load test for a bridge endpoint")
+    parser.add_argument("--url", help="Bridge base URL (default: serve this checkout's bridge)")
+    parser.add_argument("--path", default="/system/status", help="Endpoint to poll")
+    parser.add_argument("--method", default="GET", choices=["GET", "POST"])
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--seconds", type=float, default=10, help="Test duration")
+    parser.add_argument("--threads", type=int, default=16, help="waitress threads when serving the bridge")
+    args = parser.parse_args()
+
+    proc = work_dir = None
+    base = args.url
+    if not base:
+        proc, work_dir, base = serve_bridge(args.threads)
+    try:
+        rate, p50, p95, errors = load(base.rstrip('/') + args.path, args.method, args.clients, args.seconds)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+            shutil.rmtree(work_dir)
+    print(f"{args.method} {args.path}: {rate:.0f} req/s, p50 {p50:.1f} ms, p95 {p95:.1f} ms, "
+          f"{errors} errors ({args.clients} clients, {args.seconds:.0f}s)")
+    sys.exit(1 if errors else 0)
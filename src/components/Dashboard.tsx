@@ -1,5 +1,6 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import { Layers, Zap, Database, ArrowRight } from 'lucide-react';
+import { fetchAggregates, Aggregates } from '../lib/dataService';
 
 interface DashboardProps {
   types: string[];
@@ -9,6 +10,21 @@ interface DashboardProps {
 
 export const Dashboard: React.FC<DashboardProps> = ({ types, onSelectCategory, rowCount }) => {
   const displayTypes = types.filter(t => t !== 'All' && t !== 'Home');
+  const [aggregates, setAggregates] = useState<Aggregates | null>(null);
+
+  useEffect(() => {
+    let isMounted = true;
+    fetchAggregates().then(a => {
+      if (isMounted) setAggregates(a);
+    });
+    return () => {
+      isMounted = false;
+    };
+  }, []);
+
+  // Precomputed server-side, so these don't depend on how many rows have loaded
+  const totalRows = aggregates ? aggregates.total_rows : rowCount;
+  const topLender = aggregates?.top_secured_parties[0];
 
   return (
     <div className="flex-1 overflow-y-auto bg-white dark:bg-slate-900 transition-colors duration-200">
@@ -25,8 +41,14 @@ export const Dashboard: React.FC<DashboardProps> = ({ types, onSelectCategory, r
           Your central repository for business intelligence and data insights.
           Empowering your team with information that drives informed decisions.
           <span className="block mt-4 text-sm font-medium text-gray-400 dark:text-slate-500 italic">
-            Currently indexing {rowCount.toLocaleString()} records across {displayTypes.length} categories.
+            Currently indexing {totalRows.toLocaleString()} records across {displayTypes.length} categories.
           </span>
+          {aggregates && (
+            <span className="block mt-1 text-sm font-medium text-gray-400 dark:text-slate-500 italic">
+              {(aggregates.status_counts['Filed'] || 0).toLocaleString()} active filings, {(aggregates.expiring['90'] || 0).toLocaleString()} expiring in the next 90 days
+              {topLender && <>, top secured party {topLender.name}</>}.
+            </span>
+          )}
         </p>
 
         <div className="grid grid-cols-1 md:grid-cols-2 gap-6 w-full mb-16">
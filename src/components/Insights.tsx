@@ -5,6 +5,7 @@ import {
   AreaChart, Area, Treemap
 } from 'recharts';
 import { PieChart as PieIcon, BarChart3, TrendingUp, Users, Database, ShieldCheck, Activity, FileText, Building2, MapPin, Settings2, Info } from 'lucide-react';
+import { fetchAggregates, aggregatesFromRows, recentFilingsWindow, Aggregates } from '../lib/dataService';
 
 interface InsightsProps {
   data: any[];
@@ -29,135 +30,64 @@ export const Insights: React.FC<InsightsProps> = ({ data, types, onNavigate, onF
 
   const displayTypes = types.filter(t => t !== 'All' && t !== 'Home');
 
-  const statusData = useMemo(() => {
-    const counts: Record<string, number> = {};
-    data.forEach(row => {
-      const status = row.Status || row.STATUS || 'Unknown';
-      counts[status] = (counts[status] || 0) + 1;
-    });
-    return Object.entries(counts)
-      .map(([name, value]) => ({ name, value }))
-      .sort((a, b) => b.value - a.value)
-      .slice(0, 8); // Top 8 statuses
-  }, [data]);
-
-  const categoryData = useMemo(() => {
-    const counts: Record<string, number> = {};
-    data.forEach(row => {
-      const type = row._type || 'Unknown';
-      counts[type] = (counts[type] || 0) + 1;
+  // Counts come precomputed from aggregates.json, so nothing here scales with
+  // the loaded rows; those are only scanned if the aggregates are unreachable
+  const [aggregates, setAggregates] = useState<Aggregates | null | undefined>(undefined);
+
+  React.useEffect(() => {
+    let isMounted = true;
+    fetchAggregates().then(a => {
+      if (isMounted) setAggregates(a);
     });
-    return Object.entries(counts)
+    return () => {
+      isMounted = false;
+    };
+  }, []);
+
+  const stats = useMemo(
+    () => aggregates === undefined ? aggregatesFromRows([]) : aggregates ?? aggregatesFromRows(data),
+    [aggregates, data]
+  );
+
+  const ranked = (counts: Record<string, number>) =>
+    Object.entries(counts)
       .map(([name, value]) => ({ name, value }))
       .sort((a, b) => b.value - a.value);
-  }, [data]);
 
-  const filteredTimeframeData = useMemo(() => {
-    const last90DaysData = data.filter(row => row._type === 'Last 90 Days');
-    if (timeframe === 90) return last90DaysData;
+  const statusData = useMemo(() => ranked(stats.sunbiz_status_counts).slice(0, 8), [stats]); // Top 8 statuses
 
-    const dates = last90DaysData.map(d => new Date(d['Record Date']).getTime()).filter(t => !isNaN(t));
-    if (dates.length === 0) return last90DaysData;
+  const categoryData = useMemo(() => ranked(stats.rows_by_type), [stats]);
 
-    const maxDate = new Date(Math.max(...dates));
-    const cutoffDate = new Date(maxDate);
-    cutoffDate.setDate(cutoffDate.getDate() - timeframe);
-
-    return last90DaysData.filter(row => {
-      const dateStr = row['Record Date'];
-      if (!dateStr) return false;
-      const d = new Date(dateStr);
-      return !isNaN(d.getTime()) && d >= cutoffDate;
-    });
-  }, [data, timeframe]);
+  const recentFilings = useMemo(
+    () => recentFilingsWindow(stats.recent_filings, timeframe === 90 ? Infinity : timeframe),
+    [stats, timeframe]
+  );
 
   const marketShareData = useMemo(() => {
-    const counts: Record<string, number> = {};
-    filteredTimeframeData.forEach(row => {
-      const name = row['Reverse Name'] || 'Unknown';
-      counts[name] = (counts[name] || 0) + 1;
-    });
-    return Object.entries(counts)
-      .map(([name, value]) => ({ name, value }))
-      .sort((a, b) => b.value - a.value)
+    return ranked(recentFilings.lenders)
       .slice(0, 10)
       .sort((a, b) => a.value - b.value); // Largest on the right
-  }, [filteredTimeframeData]);
-
-  const uniqueReverseNames = useMemo(() => {
-    const names = new Set(
-      filteredTimeframeData
-        .map(row => row['Reverse Name'])
-        .filter(Boolean)
-    );
-    return names.size;
-  }, [filteredTimeframeData]);
-
-  const filingVelocityData = useMemo(() => {
-    const counts: Record<string, number> = {};
-    filteredTimeframeData.forEach(row => {
-      const dateStr = row['Record Date'];
-      if (!dateStr) return;
-      counts[dateStr] = (counts[dateStr] || 0) + 1;
-    });
+  }, [recentFilings]);
 
-    return Object.entries(counts)
-      .map(([date, count]) => ({ date, count }))
-      .sort((a, b) => new Date(a.date).getTime() - new Date(b.date).getTime());
-  }, [filteredTimeframeData]);
+  const uniqueReverseNames = Object.keys(recentFilings.lenders).length;
 
-  const docTypeData = useMemo(() => {
-    const counts: Record<string, number> = {};
-    filteredTimeframeData.forEach(row => {
-      const type = row['Doc Type'] || 'Unknown';
-      counts[type] = (counts[type] || 0) + 1;
-    });
-    return Object.entries(counts)
-      .map(([name, value]) => ({ name, value }))
-      .sort((a, b) => b.value - a.value)
-      .slice(0, 8);
-  }, [filteredTimeframeData]);
-
-  const entityTypeData = useMemo(() => {
-    const counts: Record<string, number> = {};
-    data.forEach(row => {
-      const type = row['Entity Type'] || 'Unknown';
-      counts[type] = (counts[type] || 0) + 1;
-    });
-    return Object.entries(counts)
-      .map(([name, value]) => ({ name, value }))
-      .filter(entry => entry.name !== 'Unknown')
-      .sort((a, b) => b.value - a.value)
-      .slice(0, 8);
-  }, [data]);
+  const filingVelocityData = recentFilings.byDate;
+
+  const docTypeData = useMemo(() => ranked(recentFilings.doc_types).slice(0, 8), [recentFilings]);
+
+  const entityTypeData = useMemo(() => ranked(stats.entity_type_counts).slice(0, 8), [stats]);
 
   const zipData = useMemo(() => {
-    const counts: Record<string, number> = {};
-    data.forEach(row => {
-      const zip = row._zip || row.Zip || row.ZIP || 'Unknown';
-      if (zip && zip !== 'Unknown' && zip.length >= 5) {
-        counts[zip] = (counts[zip] || 0) + 1;
-      }
-    });
-    return Object.entries(counts)
-      .map(([name, value]) => ({ name, value }))
-      .sort((a, b) => b.value - a.value)
+    return ranked(stats.zip_counts)
+      .filter(entry => entry.name.length >= 5)
       .slice(0, 15);
-  }, [data]);
+  }, [stats]);
 
   const cityData = useMemo(() => {
-    const counts: Record<string, number> = {};
-    data.forEach(row => {
-      const city = row._location || row.Location || row.City || 'Unknown';
-      if (city && city !== 'Unknown' && city !== 'Link' && city.length > 2) {
-        counts[city] = (counts[city] || 0) + 1;
-      }
-    });
-    return Object.entries(counts)
-      .map(([name, value]) => ({ name, value }))
-      .sort((a, b) => b.value - a.value)
+    return ranked(stats.rows_by_location)
+      .filter(entry => entry.name !== 'Link' && entry.name.length > 2)
       .slice(0, 10);
-  }, [data]);
+  }, [stats]);
 
   const visuals = [
     { id: 'territory', label: 'Territory & Market', icon: MapPin, color: 'text-amber-500' },
@@ -172,8 +102,8 @@ export const Insights: React.FC<InsightsProps> = ({ data, types, onNavigate, onF
   const COLORS = ['#3b82f6', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#ec4899', '#06b6d4', '#f97316'];
 
   const analysisBlurbs = useMemo(() => {
-    const total = data.length;
-    const tfTotal = filteredTimeframeData.length;
+    const total = stats.total_rows;
+    const tfTotal = recentFilings.count;
 
     return {
       territory: () => {
@@ -204,7 +134,7 @@ export const Insights: React.FC<InsightsProps> = ({ data, types, onNavigate, onF
         return `Corporate structure is primarily ${entityTypeData[0]?.name}. This helps tailor your service model to specific entity needs.`;
       }
     };
-  }, [data, zipData, statusData, displayTypes, categoryData, marketShareData, filingVelocityData, docTypeData, entityTypeData]);
+  }, [stats, recentFilings, zipData, statusData, displayTypes, categoryData, marketShareData, filingVelocityData, docTypeData, entityTypeData]);
 
   const AdjustHint = () => (
     <div className="flex items-center space-x-2 opacity-20 hover:opacity-100 transition-opacity duration-300 cursor-help group/hint">
@@ -261,7 +191,7 @@ export const Insights: React.FC<InsightsProps> = ({ data, types, onNavigate, onF
           <div className="flex items-center space-x-2 bg-white dark:bg-slate-900 p-1.5 rounded-lg border border-gray-200 dark:border-slate-800 shadow-sm">
              <div className="px-3 py-1.5 flex flex-col items-center border-r border-gray-100 dark:border-slate-800">
                 <span className="text-[10px] font-bold text-gray-400 dark:text-slate-500 uppercase tracking-widest">Total Records</span>
-                <span className="text-lg font-bold text-blue-600 dark:text-blue-400">{data.length.toLocaleString()}</span>
+                <span className="text-lg font-bold text-blue-600 dark:text-blue-400">{stats.total_rows.toLocaleString()}</span>
              </div>
              <div className="px-3 py-1.5 flex flex-col items-center">
                 <span className="text-[10px] font-bold text-gray-400 dark:text-slate-500 uppercase tracking-widest">Categories</span>
@@ -1,5 +1,6 @@
 import React, { useMemo, useState, useEffect, useRef } from 'react';
 import { MapPin, TrendingUp, Users, Target, ChevronRight, Layers, Maximize2, Filter, Search, Plus, Minus, Navigation, Lock, Unlock } from 'lucide-react';
+import { fetchAggregates, aggregatesFromRows, Aggregates } from '../lib/dataService';
 
 interface TerritoryMapProps {
   data: any[];
@@ -39,32 +40,43 @@ export const TerritoryMap: React.FC<TerritoryMapProps> = ({ data, onSelectZip })
   // Key Zip Codes from the data
   const ZIP_CODES = ['33408', '33027', '33301', '33401', '33480', '33431', '33444', '33020', '33131'];
 
-  const stats = useMemo(() => {
-    const counts: Record<string, { volume: number, growth: number, avgScore: number, totalScore: number }> = {};
-
-    ZIP_CODES.forEach(zip => {
-      counts[zip] = { volume: 0, growth: 0, avgScore: 0, totalScore: 0 };
-    });
+  // Volume and dated-filing counts per zip come from aggregates.json; loaded
+  // rows are only scanned if it can't be fetched
+  const [aggregates, setAggregates] = useState<Aggregates | null | undefined>(undefined);
 
-    data.forEach(row => {
-      const zip = row._zip || row.Zip || row.ZIP;
-      if (counts[zip]) {
-        counts[zip].volume++;
-        counts[zip].totalScore += (row.Score || 0);
-        if (row._type === 'Last 90 Days' || row['Record Date'] || row['Date Filed']) {
-          counts[zip].growth++;
-        }
-      }
+  useEffect(() => {
+    let isMounted = true;
+    fetchAggregates().then(a => {
+      if (isMounted) setAggregates(a);
     });
+    return () => {
+      isMounted = false;
+    };
+  }, []);
 
+  const stats = useMemo(() => {
+    const source = aggregates === undefined ? aggregatesFromRows([]) : aggregates ?? aggregatesFromRows(data);
+    const counts: Record<string, { volume: number, growth: number }> = {};
     ZIP_CODES.forEach(zip => {
-      if (counts[zip].volume > 0) {
-        counts[zip].avgScore = Math.round(counts[zip].totalScore / counts[zip].volume);
-      }
+      counts[zip] = { volume: source.zip_counts[zip] || 0, growth: source.dated_zip_counts[zip] || 0 };
     });
-
     return counts;
-  }, [data]);
+  }, [aggregates, data]);
+
+  // Lead scores are computed in the browser, so the average is only worked
+  // out for the zip being inspected
+  const hoveredAvgScore = useMemo(() => {
+    if (!hoveredZip) return 0;
+    let total = 0;
+    let count = 0;
+    for (const row of data) {
+      if ((row._zip || row.Zip || row.ZIP) === hoveredZip) {
+        total += row.Score || 0;
+        count++;
+      }
+    }
+    return count > 0 ? Math.round(total / count) : 0;
+  }, [data, hoveredZip]);
 
   const maxVolume = Math.max(...Object.values(stats).map(s => s.volume), 1);
   const maxGrowth = Math.max(...Object.values(stats).map(s => s.growth), 1);
@@ -395,7 +407,7 @@ export const TerritoryMap: React.FC<TerritoryMapProps> = ({ data, onSelectZip })
               </div>
               <div className="p-1.5 md:p-2 bg-blue-50 dark:bg-blue-900/20 rounded-xl">
                 <span className="text-[8px] md:text-[9px] text-blue-600 uppercase font-bold block mb-0.5 md:mb-1">Score</span>
-                <span className="text-xs md:text-sm font-black text-blue-600">{stats[hoveredZip]?.avgScore}</span>
+                <span className="text-xs md:text-sm font-black text-blue-600">{hoveredAvgScore}</span>
               </div>
             </div>
 
@@ -439,7 +439,10 @@ export const UCCAutomation: React.FC<UCCAutomationProps> = ({ onComplete }) => {
 
             <div className="flex items-center justify-between text-xs text-blue-600 font-medium">
               <span>Processing: {jobStatus.current_name || '...'}</span>
-              <span>{Math.round(jobStatus.total * (jobStatus.progress / 100))} / {jobStatus.total} Records</span>
+              <span>
+                {jobStatus.matches ? `${jobStatus.matches} filings found · ` : ''}
+                {Math.round(jobStatus.total * (jobStatus.progress / 100))} / {jobStatus.total} Records
+              </span>
             </div>
 
             {/* Live Results Table */}
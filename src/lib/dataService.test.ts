@@ -1,5 +1,5 @@
 import { describe, it, expect, vi } from 'vitest';
-import { loadCsv, scrubValue } from './dataService';
+import { loadCsv, scrubValue, aggregatesFromRows, recentFilingsWindow, applyHubMappings } from './dataService';
 import Papa from 'papaparse';
 
 vi.mock('papaparse', () => ({
@@ -83,4 +83,88 @@ describe('dataService', () => {
       '_zip': '33101'
     });
   });
-});
\ No newline at end of file
+
+  it('should load a precompiled snapshot without parsing the CSV', async () => {
+    const parseCalls = (Papa.parse as any).mock.calls.length;
+    const fetchMock = vi.fn().mockResolvedValue({
+      ok: true,
+      json: async () => ({
+        version: 1,
+        rule: 'Yellow Pages',
+        columns: ['Category', 'businessName', 'Phone', '_zip', '_location'],
+        rows: [['Plumbing', 'Bob Smith', '(555) 123-4567', '33101', 'Miami']]
+      })
+    });
+    vi.stubGlobal('fetch', fetchMock);
+
+    const file = {
+      path: 'Data/YP/test.csv',
+      type: 'YP',
+      zip: '33101',
+      location: 'Miami',
+      filename: 'test.csv',
+      snapshot: 'snapshots/YP/test.json'
+    };
+
+    const result = await loadCsv(file);
+    vi.unstubAllGlobals();
+
+    expect(fetchMock).toHaveBeenCalledWith('http://localhost/snapshots/YP/test.json');
+    expect((Papa.parse as any).mock.calls.length).toBe(parseCalls);
+    expect(result[0]).toMatchObject({
+      'businessName': 'Bob Smith',
+      'Phone': '(555) 123-4567',
+      '_source': 'test.csv',
+      '_type': 'YP',
+      '_zip': '33101'
+    });
+  });
+
+  it('should sum recent filings over a window anchored on the latest record date', () => {
+    const agg = aggregatesFromRows([
+      { _type: 'Last 90 Days', 'Record Date': '11/20/2025', 'Reverse Name': 'BANK A', 'Doc Type': 'UCC' },
+      { _type: 'Last 90 Days', 'Record Date': '11/10/2025', 'Reverse Name': 'BANK B', 'Doc Type': 'UCC' },
+      { _type: 'Last 90 Days', 'Record Date': '09/01/2025', 'Reverse Name': 'BANK A', 'Doc Type': 'LIEN' },
+      { _type: '1. SB', _zip: '33401', 'Sunbiz Status': 'Active', 'Date Filed': '01/01/2020' }
+    ]);
+
+    expect(agg.total_rows).toBe(4);
+    expect(agg.dated_zip_counts).toEqual({ '33401': 1 });
+
+    const month = recentFilingsWindow(agg.recent_filings, 30);
+    expect(month.count).toBe(2);
+    expect(month.lenders).toEqual({ 'BANK A': 1, 'BANK B': 1 });
+    expect(month.byDate).toEqual([{ date: '11/10/2025', count: 1 }, { date: '11/20/2025', count: 1 }]);
+
+    const all = recentFilingsWindow(agg.recent_filings, Infinity);
+    expect(all.count).toBe(3);
+    expect(all.doc_types).toEqual({ 'UCC': 2, 'LIEN': 1 });
+  });
+
+  it('should parse a CSV without a snapshot with the same rules as the snapshot builder', () => {
+    const row = Array.from({ length: 56 }, () => '');
+    row[0] = 'ACME HOLDINGS LLC';
+    row[1] = 'L15000012345';
+    row[2] = 'INACTIVE';
+    row[4] = 'https://search.sunbiz.org/Inquiry/CorporationSearch/SearchResultDetail?aggregateId=x';
+    row[22] = 'MGR';
+    row[23] = 'DOE, JANE';
+    row[42] = '1/5/2020';
+
+    const file = { path: 'Data/1. SB/SB 33480.csv', type: '1. SB', zip: '33480', location: 'Palm Beach', filename: 'SB 33480.csv' };
+    const snapshot = applyHubMappings([row, Array.from({ length: 56 }, () => '')], file);
+    const obj = Object.fromEntries(snapshot.columns.map((c, i) => [c, snapshot.rows[0][i]]));
+
+    expect(snapshot.rule).toBe('56-Column UCC/SB Master Format');
+    expect(snapshot.rows.length).toBe(1);
+    expect(obj).toMatchObject({
+      'businessName': 'ACME HOLDINGS LLC',
+      'Sunbiz Status': 'INACT',
+      'Officer Title': 'MGR',
+      'Officer': 'DOE, JANE',
+      'Date Filed': '01/05/2020',
+      '_zip': '33480'
+    });
+    expect(obj['Sunbiz Link']).toContain('sunbiz.org');
+  });
+});
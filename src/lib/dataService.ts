@@ -1,5 +1,6 @@
 import Papa from 'papaparse';
 import { calculateScore } from './scoring';
+import hubMappings from '../../hub_mappings.json';
 
 export interface FileManifest {
   path: string;
@@ -8,6 +9,7 @@ export interface FileManifest {
   location?: string;
   category?: string;
   filename: string;
+  snapshot?: string;
 }
 
 export interface DataRow {
@@ -96,9 +98,107 @@ export interface JobStatus {
   status: string;
   errors: string[];
   start_time: string;
+  matches?: number;
   results?: any[];
 }
 
+export interface RecentFilingDay {
+  count: number;
+  lenders: Record<string, number>;
+  doc_types: Record<string, number>;
+}
+
+export interface Aggregates {
+  generated_at: string;
+  as_of: string;
+  total_rows: number;
+  rows_by_type: Record<string, number>;
+  status_counts: Record<string, number>;
+  top_secured_parties: { name: string; value: number }[];
+  expiring: Record<string, number>;
+  expires_by_date: Record<string, number>;
+  zip_counts: Record<string, number>;
+  dated_zip_counts: Record<string, number>;
+  rows_by_location: Record<string, number>;
+  sunbiz_status_counts: Record<string, number>;
+  entity_type_counts: Record<string, number>;
+  recent_filings: Record<string, RecentFilingDay>; // keyed by ISO record date
+}
+
+function bump(counts: Record<string, number>, key: string, n = 1) {
+  counts[key] = (counts[key] || 0) + n;
+}
+
+function isoDate(value: string): string | null {
+  const m = /^(\d{1,2})\/(\d{1,2})\/(\d{4})/.exec(value.trim());
+  if (m) return `${m[3]}-${m[1].padStart(2, '0')}-${m[2].padStart(2, '0')}`;
+  return /^\d{4}-\d{2}-\d{2}/.test(value) ? value.slice(0, 10) : null;
+}
+
+/**
+ * Builds the same shape as aggregates.json from rows already in memory. Only
+ * used when neither the bridge nor the static artifact is reachable.
+ */
+export function aggregatesFromRows(rows: DataRow[]): Aggregates {
+  const agg: Aggregates = {
+    generated_at: new Date().toISOString(), as_of: new Date().toISOString().slice(0, 10),
+    total_rows: rows.length, rows_by_type: {}, status_counts: {}, top_secured_parties: [],
+    expiring: {}, expires_by_date: {}, zip_counts: {}, dated_zip_counts: {}, rows_by_location: {},
+    sunbiz_status_counts: {}, entity_type_counts: {}, recent_filings: {},
+  };
+  for (const row of rows) {
+    bump(agg.rows_by_type, row._type || 'Unknown');
+    if (row['UCC Status']) bump(agg.status_counts, row['UCC Status']);
+    if (row['Sunbiz Status']) bump(agg.sunbiz_status_counts, row['Sunbiz Status']);
+    if (row['Entity Type']) bump(agg.entity_type_counts, row['Entity Type']);
+    if (row._location) bump(agg.rows_by_location, row._location);
+    const zip = row._zip || row.Zip;
+    if (zip) {
+      bump(agg.zip_counts, zip);
+      if (row['Date Filed']) bump(agg.dated_zip_counts, zip);
+    }
+    const recorded = row._type === 'Last 90 Days' && row['Record Date'] ? isoDate(row['Record Date']) : null;
+    if (recorded) {
+      if (!agg.recent_filings[recorded]) agg.recent_filings[recorded] = { count: 0, lenders: {}, doc_types: {} };
+      const day = agg.recent_filings[recorded];
+      day.count++;
+      if (row['Reverse Name']) bump(day.lenders, row['Reverse Name']);
+      if (row['Doc Type']) bump(day.doc_types, row['Doc Type']);
+    }
+  }
+  return agg;
+}
+
+/**
+ * Sums recent filings over the `days` up to and including the latest record
+ * date (the county export is not always current, so the window is anchored
+ * on the data rather than on today).
+ */
+export function recentFilingsWindow(recent: Record<string, RecentFilingDay>, days: number) {
+  const dates = Object.keys(recent).sort();
+  const total: RecentFilingDay = { count: 0, lenders: {}, doc_types: {} };
+  const byDate: { date: string; count: number }[] = [];
+  if (dates.length === 0) return { ...total, byDate };
+
+  let from = '';
+  if (Number.isFinite(days)) {
+    const cutoff = new Date(dates[dates.length - 1] + 'T00:00:00Z');
+    cutoff.setUTCDate(cutoff.getUTCDate() - days);
+    from = cutoff.toISOString().slice(0, 10);
+  }
+
+  for (const date of dates) {
+    if (date < from) continue;
+    const day = recent[date];
+    total.count += day.count;
+    for (const [k, n] of Object.entries(day.lenders)) bump(total.lenders, k, n);
+    for (const [k, n] of Object.entries(day.doc_types)) bump(total.doc_types, k, n);
+    const [y, m, d] = date.split('-');
+    byDate.push({ date: `${m}/${d}/${y}`, count: day.count });
+  }
+  return { ...total, byDate };
+}
+
 export interface GithubConfig {
   token: string;
   owner: string;
@@ -228,6 +328,20 @@ export async function fetchSystemStatus(): Promise<{ bridge: string; watcher: st
   }
 }
 
+export async function fetchAggregates(): Promise<Aggregates | null> {
+  // Prefer the bridge (expiry windows relative to today), fall back to the static artifact
+  const urls = [getBridgeUrl('/aggregates'), './aggregates.json?t=' + Date.now()].filter(Boolean) as string[];
+  for (const url of urls) {
+    try {
+      const response = await fetch(url);
+      if (response.ok) return await response.json();
+    } catch {
+      // Try the next source
+    }
+  }
+  return null;
+}
+
 export async function restartSystem(): Promise<boolean> {
   try {
     const url = getBridgeUrl('/system/restart');
@@ -312,12 +426,251 @@ export async function dispatchUccAction(names: string[], mode: string, threshold
   }
 }
 
+interface HubSnapshot {
+  version: number;
+  rule: string | null;
+  columns: string[];
+  rows: string[][];
+}
+
+interface HubRuleWhen {
+  columns?: number;
+  min_columns?: number;
+  max_columns?: number;
+  type?: string;
+  type_contains?: string;
+  type_in?: string[];
+}
+
+interface HubRule {
+  name: string;
+  when?: HubRuleWhen;
+  header?: boolean | string;
+  use_headers?: boolean;
+  dedupe_headers?: boolean;
+  aliases?: Record<string, string>;
+  columns?: Record<string, string>;
+  variants?: { when_any_cell: string; columns: Record<string, string> }[];
+  not_aggregated?: string[];  // read by ucc_aggregates.py only
+}
+
+interface HubMappings {
+  field_types?: Record<string, string>;
+  value_maps?: Record<string, Record<string, string>>;
+  filters?: { when?: HubRuleWhen; require_any: string[] }[];
+  rules: HubRule[];
+}
+
+// The same file hub_snapshots.py builds the snapshots from, so a hub parsed here
+// comes out exactly as its snapshot would
+const HUB_MAPPINGS = hubMappings as HubMappings;
+
+const HEADERLESS_CELL_REGEX = /\d{3}\D\d{3}\D\d{4}|http|www\./;
+const DATE_REGEX = /\d{1,2}\/\d{1,2}\/\d{2,4}/;
+const LEADING_DATE_REGEX = /^(\d{1,2})\/(\d{1,2})\/(\d{4})\b/;
+const ISO_DATE_REGEX = /^(\d{4})-(\d{2})-(\d{2})/;
+
+function normalizeDate(value: string): string {
+  let match = LEADING_DATE_REGEX.exec(value);
+  if (match) return `${match[1].padStart(2, '0')}/${match[2].padStart(2, '0')}/${match[3]}`;
+  match = ISO_DATE_REGEX.exec(value);
+  if (match) return `${match[2]}/${match[3]}/${match[1]}`;
+  return value;
+}
+
+function normalizePhone(value: string): string {
+  let digits = value.replace(/\D/g, '');
+  if (digits.length === 11 && digits.startsWith('1')) digits = digits.slice(1);
+  if (digits.length === 10) return `(${digits.slice(0, 3)}) ${digits.slice(3, 6)}-${digits.slice(6)}`;
+  return value;
+}
+
+const FIELD_NORMALIZERS: Record<string, (value: string) => string> = { date: normalizeDate, phone: normalizePhone };
+
+function ruleMatches(when: HubRuleWhen, fileType: string, colCount: number): boolean {
+  if (when.columns !== undefined && colCount !== when.columns) return false;
+  if (when.min_columns !== undefined && colCount < when.min_columns) return false;
+  if (when.max_columns !== undefined && colCount > when.max_columns) return false;
+  if (when.type !== undefined && fileType !== when.type) return false;
+  if (when.type_contains !== undefined && !fileType.includes(when.type_contains)) return false;
+  if (when.type_in !== undefined && !when.type_in.includes(fileType)) return false;
+  return true;
+}
+
+function selectRule(config: HubMappings, fileType: string, colCount: number): HubRule {
+  return config.rules.find(rule => ruleMatches(rule.when || {}, fileType, colCount))
+    || { name: 'Unmapped', header: 'auto_generic', use_headers: true };
+}
+
+// Dynamic pattern matching for columns the rule left unmapped
+function detectGaps(firstRow: string[], mapping: Record<number, string>) {
+  const assigned = new Set(Object.values(mapping));
+  firstRow.forEach((cell, idx) => {
+    const val = (cell || '').trim();
+    if (!val || mapping[idx] !== undefined) return;
+
+    let field: string | null = null;
+    if (DATE_REGEX.test(val)) field = 'Date Filed';
+    else if (val.toLowerCase().includes('sunbiz.org')) {
+      mapping[idx] = 'Sunbiz Link';
+      return;
+    }
+    else if (/^(FILED|LAPSED)/i.test(val)) field = 'UCC Status';
+    else if (/^(ACTIVE|INACT|DISS|DELQ|UA)/i.test(val)) field = 'Sunbiz Status';
+    else if (isDocumentNumber(val)) field = 'Document Number';
+    else if (isPhoneNumber(val)) field = 'Phone';
+    else if (/^\d{2}-\d{7}$|^\d{9}$/.test(val) && val !== '000000000') field = 'FEI/EIN Number';
+    else if (idx === 1 && val.length > 5 && !/\d/.test(val) && !val.includes(',')) field = 'Category';
+
+    if (field && !assigned.has(field)) {
+      mapping[idx] = field;
+      assigned.add(field);
+    }
+  });
+}
+
+function resolveHeaders(rule: HubRule, firstRow: string[]): [string[], boolean] {
+  let skip: boolean;
+  if (rule.header === 'auto') {
+    skip = !firstRow.some(cell => HEADERLESS_CELL_REGEX.test(cell));
+  } else if (rule.header === 'auto_generic') {
+    skip = !firstRow.some(cell =>
+      HEADERLESS_CELL_REGEX.test(cell) || (!!cell && cell.length > 5 && /^\d+$/.test(cell.trim()))
+    );
+  } else {
+    skip = !!rule.header;
+  }
+
+  if (rule.use_headers) {
+    const counts: Record<string, number> = {};
+    const headers = firstRow.map((h, i) => {
+      const name = h && h.trim() ? scrubValue(h.trim()) : `Column ${i + 1}`;
+      if (!rule.dedupe_headers) return name;
+      if (counts[name] === undefined) {
+        counts[name] = 0;
+        return name;
+      }
+      counts[name]++;
+      return `${name} (${counts[name]})`;
+    });
+    return [headers, skip];
+  }
+
+  const mapping: Record<number, string> = {};
+  for (const [k, v] of Object.entries(rule.columns || {})) mapping[Number(k)] = v;
+  for (const variant of rule.variants || []) {
+    const probe = variant.when_any_cell;
+    const hit = probe === 'phone'
+      ? firstRow.some(cell => isPhoneNumber(cell))
+      : firstRow.some(cell => cell.toLowerCase().includes(probe));
+    if (hit) {
+      for (const [k, v] of Object.entries(variant.columns)) mapping[Number(k)] = v;
+      break;
+    }
+  }
+  if (Object.keys(mapping).length > 0) detectGaps(firstRow, mapping);
+  return [firstRow.map((_, i) => mapping[i] || `Column ${i + 1}`), skip];
+}
+
+// Browser-side twin of hub_snapshots.build_snapshot, for hubs without a snapshot
+export function applyHubMappings(data: string[][], file: FileManifest, config: HubMappings = HUB_MAPPINGS): HubSnapshot {
+  data = data.filter(row => row.some(cell => cell && cell.trim()));
+  if (data.length === 0) return { version: 1, rule: null, columns: [], rows: [] };
+
+  const firstRow = data[0];
+  const rule = selectRule(config, file.type, firstRow.length);
+  const [headers, skip] = resolveHeaders(rule, firstRow);
+  const body = skip ? data.slice(1) : data;
+
+  const fieldTypes = config.field_types || {};
+  const valueMaps = config.value_maps || {};
+  const normalizers = headers.map(h => FIELD_NORMALIZERS[fieldTypes[h]]);
+  const maps = headers.map(h => valueMaps[h]);
+  const aliasSources = Object.entries(rule.aliases || {})
+    .filter(([, source]) => headers.includes(source))
+    .map(([target, source]) => [target, headers.indexOf(source)] as [string, number]);
+
+  let columns = [...headers, ...aliasSources.map(([target]) => target), '_zip', '_location'];
+  const zipIdx = headers.findIndex(h => h === 'Zip' || h === 'ZIP');
+  const locIdx = headers.indexOf('Location');
+  const fileZip = scrubValue(file.zip || '');
+  const fileLoc = scrubValue(file.location || '');
+
+  let rows = body.map(raw => {
+    const row = headers.map((_, i) => {
+      let value: string = i < raw.length ? scrubValue(raw[i]) : '';
+      if (value) {
+        if (normalizers[i]) value = normalizers[i](value);
+        if (maps[i]) value = maps[i][value] ?? value;
+      }
+      return value;
+    });
+    for (const [, sourceIdx] of aliasSources) row.push(row[sourceIdx]);
+    row.push(fileZip || (zipIdx >= 0 ? row[zipIdx] : ''));
+    row.push(fileLoc || (locIdx >= 0 ? row[locIdx] : ''));
+    return row;
+  });
+
+  for (const filter of config.filters || []) {
+    if (ruleMatches(filter.when || {}, file.type, firstRow.length)) {
+      const required = filter.require_any.filter(c => columns.includes(c)).map(c => columns.indexOf(c));
+      rows = rows.filter(r => required.some(i => r[i]));
+    }
+  }
+
+  // Drop columns that are empty in every row; the UI hides them anyway
+  const keep = columns.map((_, i) => i).filter(i => columns[i] === '_zip' || columns[i] === '_location' || rows.some(r => r[i]));
+  if (keep.length < columns.length) {
+    columns = keep.map(i => columns[i]);
+    rows = rows.map(r => keep.map(i => r[i]));
+  }
+
+  return { version: 1, rule: rule.name, columns, rows };
+}
+
+function snapshotToRows(snapshot: HubSnapshot, file: FileManifest): DataRow[] {
+  const columns = snapshot.columns;
+  return snapshot.rows.map(values => {
+    const obj: DataRow = {};
+    for (let i = 0; i < columns.length; i++) {
+      obj[columns[i]] = values[i];
+    }
+    obj._source = file.filename;
+    obj._type = file.type;
+    obj.Score = calculateScore(obj);
+    return obj;
+  });
+}
+
+// Snapshots are written by generate_manifest.py (see hub_snapshots.py) with the
+// hub_mappings.json rules already applied, so rows only need tagging and scoring.
+export async function loadSnapshot(file: FileManifest, baseUrl: string): Promise<DataRow[] | null> {
+  if (!file.snapshot) return null;
+  const url = new URL(file.snapshot.replace(/^\.\//, ''), baseUrl).href;
+
+  try {
+    const response = await fetch(url);
+    if (!response.ok) return null;
+    const snapshot: HubSnapshot = await response.json();
+    const rows = snapshotToRows(snapshot, file);
+    console.log(`[DataService] Completed from snapshot: ${file.filename} (${rows.length} rows, ${snapshot.rule})`);
+    return rows;
+  } catch (err) {
+    console.warn(`[DataService] Snapshot unavailable for ${file.filename}, parsing CSV`, err);
+    return null;
+  }
+}
+
 export async function loadCsv(file: FileManifest): Promise<DataRow[]> {
   // Construct absolute URL relative to the current page's directory
   // This ensures Web Workers can correctly fetch the data files
   const baseUrl = typeof window !== 'undefined'
     ? new URL('.', window.location.href).href
     : 'http://localhost/';
+
+  const snapshotRows = await loadSnapshot(file, baseUrl);
+  if (snapshotRows) return snapshotRows;
+
   const cleanPath = file.path.replace(/^\.\//, '');
   const url = new URL(cleanPath, baseUrl).href;
 
@@ -327,7 +680,7 @@ export async function loadCsv(file: FileManifest): Promise<DataRow[]> {
     Papa.parse(url, {
       download: true,
       worker: true,
-      header: false, // Detecting headers manually for flexibility
+      header: false, // Headers are resolved by the hub_mappings.json rules
       skipEmptyLines: 'greedy',
       complete: (results) => {
         const data = results.data as string[][];
@@ -337,273 +690,9 @@ export async function loadCsv(file: FileManifest): Promise<DataRow[]> {
           return;
         }
 
-        let headers: string[] = [];
-        let startIndex = 0;
-
-        // 1. Skip leading empty rows
-        while (startIndex < data.length && data[startIndex].every(cell => !cell || cell.trim() === '')) {
-          startIndex++;
-        }
-
-        if (startIndex >= data.length) {
-          resolve([]);
-          return;
-        }
-
-        const firstRow = data[startIndex];
-        const colCount = firstRow.length;
-        const m: Record<number, string> = {};
-
-        // 2. Tri-Schema Detection & Mapping
-
-        // PRIORITY 0: 56-Column UCC/SB Master Format
-        if (colCount === 56) {
-          m[0] = 'businessName';
-          m[1] = 'Document Number';
-          m[2] = 'Sunbiz Status';
-          m[3] = 'Zip';
-          m[4] = 'Sunbiz Link';
-          m[6] = 'Entity Type';
-          m[9] = 'FEI/EIN Number';
-          m[41] = 'UCC Status';
-          m[42] = 'Date Filed';
-          m[43] = 'Expires';
-          m[44] = 'Filings Completed Through';
-          m[45] = 'Summary For Filing';
-          m[55] = 'Florida UCC Link';
-        }
-        // PRIORITY 1: SUNBIZ (SB) Hub Detection
-        else if (file.type.includes('SB')) {
-          m[0] = 'businessName';
-          m[1] = 'Document Number';
-          m[2] = 'Sunbiz Status';
-          m[6] = 'Entity Type';
-          m[9] = 'FEI/EIN Number';
-
-          if (colCount >= 50) {
-            m[41] = 'UCC Status';
-            m[42] = 'Date Filed';
-            m[43] = 'Expires';
-            m[44] = 'Filings Completed Through';
-            m[45] = 'Summary For Filing';
-            m[55] = 'Florida UCC Link';
-          }
-        }
-        // PRIORITY 2: LARGE UCC EXPORT Detection
-        else if (file.type.includes('UCC') && colCount >= 50) {
-          m[0] = 'businessName';
-          m[2] = 'Sunbiz Status';
-          m[6] = 'Entity Type';
-          m[9] = 'FEI/EIN Number';
-          m[41] = 'UCC Status';
-          m[42] = 'Date Filed';
-          m[43] = 'Expires';
-          m[44] = 'Filings Completed Through';
-          m[45] = 'Summary For Filing';
-          m[55] = 'Florida UCC Link';
-        }
-        // PRIORITY 3.4: 5. OR HUB (Matches original CSV exactly)
-        else if (file.type === '5. OR') {
-          const counts: Record<string, number> = {};
-          headers = firstRow.map(h => {
-            const scrubbed = scrubValue(h);
-            if (counts[scrubbed] === undefined) {
-              counts[scrubbed] = 0;
-              return scrubbed;
-            } else {
-              counts[scrubbed]++;
-              return `${scrubbed} (${counts[scrubbed]})`;
-            }
-          });
-          startIndex++;
-        }
-        // PRIORITY 3: UCC LAST 90 DAYS (26 Columns)
-        else if (colCount >= 25 && colCount < 30) {
-          m[0] = 'UCC Status';
-          m[1] = 'businessName';
-          m[2] = 'Reverse Name';
-          m[3] = 'Record Date';
-          m[4] = 'Location';
-          m[5] = 'Doc Type';
-          m[9] = 'Instrument Number';
-          m[11] = 'Legal Description';
-          startIndex++;
-        }
-        // PRIORITY 3.6: SEARCH RESULTS HUB & B UCC
-        else if (file.type === 'Search Results' || file.type === 'B UCC') {
-          m[0] = 'DirectName';
-          m[1] = 'IndirectName';
-          m[2] = 'RecordDate';
-          m[3] = 'DocTypeDescription';
-          m[4] = 'InstrumentNumber';
-          m[5] = 'BookType';
-          m[6] = 'BookPage';
-          m[7] = 'DocLegalDescription';
-          m[8] = 'Consideration';
-          m[9] = 'CaseNumber';
-          startIndex++;
-        }
-        // PRIORITY 3.3: SCRAPED UCC RESULTS
-        else if (file.type === 'UCC Results' || file.type === '4. Test') {
-          m[0] = 'businessName'; // Search Term
-          m[1] = 'Match Score';
-          m[2] = 'UCC Status'; // Status
-          m[3] = 'Date Filed';
-          m[4] = 'Expires';
-          m[5] = 'Filings Completed Through';
-          m[6] = 'UCC Number';
-          m[7] = 'Filing Events';
-          m[8] = 'Secured Parties Count';
-          // Standard Table.tsx might not show all 5 secured parties by default,
-          // but they'll be in the row object for the sidebar.
-          for (let i = 1; i <= 5; i++) {
-            m[9 + (i - 1) * 2] = `Secured Party ${i} Name`;
-            m[10 + (i - 1) * 2] = `Secured Party ${i} Address`;
-          }
-          m[19] = 'Debtor Parties Count';
-          m[20] = 'Debtor Name';
-          m[21] = 'Debtor Address';
-          m[22] = 'Document Type';
-          m[23] = 'Document Pages';
-          startIndex++;
-        }
-        // PRIORITY 3.5: ENRICHED ZIP HUB (8 Columns)
-        else if (colCount === 8) {
-          m[0] = 'businessName';
-          // Detect schema by looking at typical content
-          const hasSunbiz = firstRow.some(cell => String(cell).toLowerCase().includes('sunbiz.org'));
-          const hasPhone = firstRow.some(cell => isPhoneNumber(String(cell)));
-
-          if (hasSunbiz) {
-            // Schema A: Sunbiz & FEI/EIN
-            m[1] = 'Sunbiz Status';
-            m[2] = 'FEI/EIN Number';
-            m[3] = 'Sunbiz Link';
-            m[4] = 'UCC Status';
-            m[5] = 'Date Filed';
-            m[6] = 'Expires';
-            m[7] = 'Florida UCC Link';
-          } else if (hasPhone) {
-            // Schema B: Phone & Website
-            m[1] = 'Phone';
-            m[2] = 'Website';
-            m[3] = 'UCC Status';
-            m[4] = 'Date Filed';
-            m[5] = 'Expires';
-            m[6] = 'Florida UCC Link';
-            m[7] = 'Category';
-          }
-        }
-        // PRIORITY 4: YELLOW PAGES (YP) Schema
-        else if (colCount >= 5) {
-          m[0] = 'Category';
-          m[2] = 'businessName';
-          m[3] = 'Phone';
-          m[4] = 'Website';
-          const isHeader = !firstRow.some(cell => /\d{3}\D\d{3}\D\d{4}|http|www\./.test(cell));
-          if (isHeader) startIndex++;
-        }
-        // FALLBACK: Generic Header Detection
-        else {
-          headers = firstRow.map((h, i) => scrubValue(h && h.trim() !== '' ? h.trim() : `Column ${i + 1}`));
-          const isHeader = !firstRow.some(cell =>
-            /\d{3}\D\d{3}\D\d{4}|http|www\./.test(cell) ||
-            (cell && cell.length > 5 && /^\d+$/.test(cell.trim()))
-          );
-          if (isHeader) startIndex++;
-        }
-
-        // 3. Dynamic Pattern Matching for remaining gaps
-        if (Object.keys(m).length > 0 && headers.length === 0) {
-          firstRow.forEach((cell, idx) => {
-            const val = String(cell || '').trim();
-            if (!val || m[idx]) return;
-
-            // Date Filed
-            if (/\d{1,2}\/\d{1,2}\/\d{2,4}/.test(val)) {
-              if (!Object.values(m).includes('Date Filed')) {
-                m[idx] = 'Date Filed';
-              }
-            }
-            // Sunbiz Link
-            else if (val.toLowerCase().includes('sunbiz.org')) {
-              m[idx] = 'Sunbiz Link';
-            }
-            // UCC Status
-            else if (/^(FILED|LAPSED)/i.test(val)) {
-              if (!Object.values(m).includes('UCC Status')) {
-                m[idx] = 'UCC Status';
-              }
-            }
-            // Sunbiz Status
-            else if (/^(ACTIVE|INACT|DISS|DELQ|UA)/i.test(val)) {
-              if (!Object.values(m).includes('Sunbiz Status')) {
-                m[idx] = 'Sunbiz Status';
-              }
-            }
-            // Document Number
-            else if (isDocumentNumber(val)) {
-              if (!Object.values(m).includes('Document Number')) {
-                m[idx] = 'Document Number';
-              }
-            }
-            // Phone
-            else if (isPhoneNumber(val)) {
-              if (!Object.values(m).includes('Phone')) {
-                m[idx] = 'Phone';
-              }
-            }
-            // FEI/EIN
-            else if (/^\d{2}-\d{7}$|^\d{9}$/.test(val) && val !== '000000000') {
-              if (!Object.values(m).includes('FEI/EIN Number')) {
-                m[idx] = 'FEI/EIN Number';
-              }
-            }
-            // Category
-            else if (idx === 1 && val.length > 5 && !/\d/.test(val) && !val.includes(',')) {
-              if (!Object.values(m).includes('Category')) {
-                m[idx] = 'Category';
-              }
-            }
-          });
-          headers = firstRow.map((_, i) => m[i] || `Column ${i + 1}`);
-        }
-
-        // 4. Row Mapping
-        const fileZip = scrubValue(file.zip || '');
-        const fileLoc = scrubValue(file.location || '');
-        const fileSource = file.filename;
-        const fileType = file.type;
-
-        let rows: DataRow[] = data.slice(startIndex).map(row => {
-          const obj: DataRow = {};
-          headers.forEach((h, i) => {
-            obj[h] = scrubValue(row[i] || '');
-          });
-          
-          // Compat mapping for 5. OR hub to ensure sidebar and scoring work
-          if (file.type === '5. OR' && obj['Corporate Name (Search)']) {
-            obj.businessName = obj['Corporate Name (Search)'];
-          }
-
-          obj._source = fileSource;
-          obj._type = fileType;
-          obj._zip = fileZip || scrubValue(obj['Zip'] || obj['ZIP'] || '');
-          obj._location = fileLoc || scrubValue(obj['Location'] || '');
-          obj.Score = calculateScore(obj);
-          
-          return obj;
-        });
-
-        // 5. Post-processing Filter for Sunbiz
-        if (file.type.includes('SB')) {
-          rows = rows.filter(row => {
-            const name = row['businessName'] || row['Document Number'] || row['Column 1'];
-            return !!name; 
-          });
-        }
-
-        console.log(`[DataService] Completed: ${file.filename} (${rows.length} rows)`);
+        const snapshot = applyHubMappings(data, file);
+        const rows = snapshotToRows(snapshot, file);
+        console.log(`[DataService] Completed: ${file.filename} (${rows.length} rows, ${snapshot.rule})`);
         resolve(rows);
       },
       error: (err) => {
@@ -0,0 +1,74 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import ucc_aggregates
+import ucc_sunbiz
+from ucc_records import FIELDNAMES
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+LAST_90 = os.path.join(ROOT, "Data", "Last 90 Days", "UCC Search Last 90.csv")
+
+
+class ScanFileTest(unittest.TestCase):
+    """scan_file layouts come from the hub_mappings.json rules."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(ROOT)
+        self.tmp = tempfile.mkdtemp()
+        patch = mock.patch.object(ucc_aggregates, "DATA_ROOT", os.path.join(self.tmp, "Data"))
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+
+    def write(self, rel_path, rows):
+        path = os.path.join(ucc_aggregates.DATA_ROOT, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(rows)
+        return path
+
+    def test_sunbiz_enrichment_header_is_not_a_row(self):
+        record = dict.fromkeys(ucc_sunbiz.FIELDNAMES, "")
+        record.update({"Document Number": "L15000012345", "Sunbiz Status": "ACTIVE",
+                       "Entity Type": "Florida Limited Liability Company"})
+        path = self.write(os.path.join("SunBiz Results", "sunbiz_enrichment.csv"),
+                          [ucc_sunbiz.FIELDNAMES, list(record.values())])
+        counts = ucc_aggregates.scan_file(path)["counts"]
+        self.assertEqual(counts["rows"], 1)
+        self.assertEqual(counts["sunbiz_status"], {"Active": 1})
+        self.assertEqual(counts["entity_types"], {"Florida Limited Liability Company": 1})
+
+    def test_scraped_results(self):
+        filing = dict.fromkeys(FIELDNAMES, "")
+        filing.update({"Search Term": "ACME LLC", "Status": "Filed", "Expires": "01/02/2030",
+                       "UCC Number": "2020001", "Secured Party 1 Name": "STUB BANK"})
+        miss = dict.fromkeys(FIELDNAMES, "")
+        miss.update({"Search Term": "BETA INC", "Status": "No results"})
+        path = self.write(os.path.join("UCC Results", "all_results.csv"),
+                          [FIELDNAMES, list(filing.values()), list(miss.values())])
+        counts = ucc_aggregates.scan_file(path)["counts"]
+        self.assertEqual(counts["rows"], 2)
+        self.assertEqual(counts["status"], {"Filed": 1, "No results": 1})
+        self.assertEqual(counts["expires"], {"2030-01-02": 1})
+        self.assertEqual(counts["secured_parties"], {"STUB BANK": 1})
+
+    def test_county_record_flag_is_not_a_ucc_status(self):
+        with open(LAST_90, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))[:4]
+        path = self.write(os.path.join("Last 90 Days", "UCC Search Last 90.csv"), rows)
+        counts = ucc_aggregates.scan_file(path)["counts"]
+        self.assertEqual(counts["rows"], 3)
+        self.assertEqual(counts["status"], {})
+        self.assertEqual(sum(day["count"] for day in counts["recent"].values()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
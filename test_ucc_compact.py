@@ -0,0 +1,115 @@
+import csv
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import ucc_compact
+from ucc_records import FIELDNAMES, FIELD_INDEX
+
+
+def row(name, status, ucc_number=""):
+    values = [""] * len(FIELDNAMES)
+    values[FIELD_INDEX["Search Term"]] = name
+    values[FIELD_INDEX["Status"]] = status
+    values[FIELD_INDEX["UCC Number"]] = ucc_number
+    return values
+
+
+def encode(rows):
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue().encode('utf-8')
+
+
+class CompactResultsTest(unittest.TestCase):
+    """compact_results on scratch output files, with its bookkeeping files in
+    a scratch COMPACTION_DIR."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        patch = mock.patch.object(ucc_compact, "COMPACTION_DIR", os.path.join(self.tmp, ".compaction"))
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.output_file = os.path.join(self.tmp, "all_results.csv")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def append(self, rows, output_file=None):
+        output_file = output_file or self.output_file
+        header = [] if os.path.exists(output_file) else [FIELDNAMES]
+        with open(output_file, 'ab') as f:
+            f.write(encode(header + rows))
+
+    def read(self, output_file=None):
+        with open(output_file or self.output_file, newline='', encoding='utf-8') as f:
+            return list(csv.reader(f))[1:]
+
+    def test_match_miss_match_miss(self):
+        filing = row("ACME LLC", "Filed", "2020001")
+        self.append([filing, row("ACME LLC", "No results"), filing, row("ACME LLC", "No results")])
+        ucc_compact.compact_results(self.output_file)
+        # The last match supersedes the miss before it, not the one after it
+        self.assertEqual(self.read(), [filing])
+        self.assertEqual(ucc_compact.load_negative_lookups(self.output_file)["ACME LLC"]["misses"], 1)
+
+    def test_match_after_misses_clears_them(self):
+        filing = row("ACME LLC", "Filed", "2020001")
+        self.append([row("ACME LLC", "No results"), filing, row("ACME LLC", "No results"), filing])
+        ucc_compact.compact_results(self.output_file)
+        self.assertEqual(self.read(), [filing])
+        self.assertEqual(ucc_compact.load_negative_lookups(self.output_file), {})
+
+    def test_second_compaction_changes_nothing(self):
+        filing = row("ACME LLC", "Filed", "2020001")
+        self.append([filing, row("ACME LLC", "No results"), row("BETA INC", "No results"),
+                     row("GAMMA CO", "No close match"), row("GAMMA CO", "No close match"),
+                     row("BETA INC", "Filed", "2020002")])
+        first = ucc_compact.compact_results(self.output_file)
+        rows, negative = self.read(), ucc_compact.load_negative_lookups(self.output_file)
+        second = ucc_compact.compact_results(self.output_file)
+
+        self.assertEqual(self.read(), rows)
+        self.assertEqual(ucc_compact.load_negative_lookups(self.output_file), negative)
+        self.assertEqual(set(negative), {"ACME LLC"})
+        self.assertEqual((second["generation"], second["rows_kept"], second["bytes_reclaimed"]),
+                         (first["generation"] + 1, first["rows_kept"], 0))
+
+    def test_rows_appended_during_the_run_are_kept(self):
+        filing = row("ACME LLC", "Filed", "2020001")
+        self.append([filing, filing, row("BETA INC", "No results")])
+        late = [row("BETA INC", "Filed", "2020002"), row("GAMMA CO", "No results")]
+        fold_rows = ucc_compact.fold_rows
+
+        def append_while_folding(*args):
+            # A writer appends after the prefix was measured, before the tail copy
+            kept = fold_rows(*args)
+            self.append(late)
+            return kept
+
+        with mock.patch.object(ucc_compact, "fold_rows", append_while_folding):
+            stats = ucc_compact.compact_results(self.output_file)
+        self.assertEqual(self.read(), [filing] + late)
+        self.assertEqual(set(ucc_compact.load_negative_lookups(self.output_file)), {"BETA INC"})
+
+        # The copied tail is compacted by the next run; BETA INC's match is newer than its miss
+        ucc_compact.compact_results(self.output_file)
+        self.assertEqual(self.read(), [filing, late[0]])
+        self.assertEqual(set(ucc_compact.load_negative_lookups(self.output_file)), {"GAMMA CO"})
+        self.assertEqual(stats["rows_kept"], 1)
+
+    def test_each_output_keeps_its_own_negative_lookups(self):
+        other = os.path.join(self.tmp, "other_results.csv")
+        self.append([row("ACME LLC", "No results")])
+        self.append([row("BETA INC", "No results")], other)
+        ucc_compact.compact_results(self.output_file)
+        ucc_compact.compact_results(other)
+        self.assertEqual(set(ucc_compact.load_negative_lookups(self.output_file)), {"ACME LLC"})
+        self.assertEqual(set(ucc_compact.load_negative_lookups(other)), {"BETA INC"})
+
+
+if __name__ == "__main__":
+    unittest.main()
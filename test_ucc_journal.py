@@ -0,0 +1,96 @@
+import csv
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from ucc_journal import ScrapeJournal
+from ucc_records import FIELDNAMES, FilingRecord
+
+
+def payload_of(*names):
+    buf = io.StringIO()
+    csv.writer(buf).writerows(FilingRecord.miss(n, "No close match") for n in names)
+    return buf.getvalue().encode('utf-8')
+
+
+class RecoverTest(unittest.TestCase):
+    """A write intent left by a crash is settled against the output file."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.output_file = os.path.join(self.tmp, "all_results.csv")
+        self.journal_file = os.path.join(self.tmp, "job.journal")
+        with open(self.output_file, 'wb') as f:
+            f.write(payload_of("HEADER ROW LLC"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def crash_mid_write(self, payload, written):
+        """Logs the intent for `payload` and appends only its first `written` bytes."""
+        journal = ScrapeJournal(self.journal_file)
+        with open(self.output_file, 'ab') as f:
+            journal.begin_write("ACME LLC", f, payload, ["ACME LLC", "BETA INC"])
+            f.write(payload[:written])
+        journal.close()
+
+    def append(self, data):
+        with open(self.output_file, 'ab') as f:
+            f.write(data)
+
+    def recover(self):
+        journal = ScrapeJournal(self.journal_file)
+        redo = journal.recover(self.output_file)
+        journal.close()
+        return redo, journal
+
+    def rows(self):
+        with open(self.output_file, newline='', encoding='utf-8') as f:
+            return [r[0] for r in csv.reader(f) if len(r) == len(FIELDNAMES)]
+
+    def test_complete_write_is_committed(self):
+        payload = payload_of("ACME LLC", "BETA INC")
+        self.crash_mid_write(payload, len(payload))
+        redo, journal = self.recover()
+        self.assertEqual(redo, [])
+        self.assertEqual(journal.completed, {"ACME LLC", "BETA INC"})
+
+    def test_nothing_written_is_redone(self):
+        # Rows another writer appended at the offset are not ours to cut
+        payload = payload_of("ACME LLC", "BETA INC")
+        self.crash_mid_write(payload, 0)
+        self.append(payload_of("OTHER JOB INC"))
+        redo, _ = self.recover()
+        self.assertEqual(redo, ["ACME LLC", "BETA INC"])
+        self.assertEqual(self.rows(), ["HEADER ROW LLC", "OTHER JOB INC"])
+
+    def test_torn_tail_is_cut_off(self):
+        payload = payload_of("ACME LLC", "BETA INC")
+        self.crash_mid_write(payload, len(payload) - 10)
+        size = os.path.getsize(self.output_file)
+        redo, _ = self.recover()
+        self.assertEqual(redo, ["ACME LLC", "BETA INC"])
+        self.assertEqual(os.path.getsize(self.output_file), size - len(payload) + 10)
+        self.assertEqual(self.rows(), ["HEADER ROW LLC"])
+
+    def test_torn_write_followed_by_other_rows_is_blanked(self):
+        # A whole row and part of the next were written, then another writer
+        # appended after the fragment before this job resumed
+        payload = payload_of("ACME LLC", "BETA INC")
+        self.crash_mid_write(payload, len(payload) - 10)
+        self.append(payload_of("OTHER JOB INC"))
+        size = os.path.getsize(self.output_file)
+
+        redo, _ = self.recover()
+        self.assertEqual(redo, ["ACME LLC", "BETA INC"])
+        self.assertEqual(os.path.getsize(self.output_file), size)
+        self.assertEqual(self.rows(), ["HEADER ROW LLC", "OTHER JOB INC"])
+        with open(self.output_file, 'rb') as f:
+            lines = f.read().split(b"\n")
+        self.assertEqual(lines[1].strip(), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from ucc_queue import WorkQueue, LeaseLost
+
+
+def miss(name, status):
+    return {"Search Term": name, "UCC Status": status, "UCC Number": ""}
+
+
+class WorkQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.wq = WorkQueue(os.path.join(self.tmp, "queue.db"))
+        self.wq.enqueue_job("job", ["ACME LLC", "BETA INC"], chunk_size=2)
+
+    def tearDown(self):
+        self.wq.close()
+        shutil.rmtree(self.tmp)
+
+    def test_keeps_every_blank_numbered_row_of_a_name(self):
+        # Rows write_results_to_output would append as they are: two unmatched
+        # debtors and a filing, none collapsed for sharing a blank UCC number
+        rows = [miss("ACME LLC", "No match"), miss("ACME LLC", "No match"),
+                {"Search Term": "ACME LLC", "UCC Status": "Filed", "UCC Number": "2020001"}]
+        chunk = self.wq.lease("a")
+        self.wq.complete_name(chunk["id"], "a", "job", "ACME LLC", rows)
+        self.wq.complete_name(chunk["id"], "a", "job", "BETA INC", [miss("BETA INC", "No results")])
+        self.assertEqual(self.wq.results("job"), rows + [miss("BETA INC", "No results")])
+
+    def test_name_committed_twice_keeps_one_copy(self):
+        chunk = self.wq.lease("a")
+        rows = [miss("ACME LLC", "No match"), miss("ACME LLC", "No match")]
+        self.wq.complete_name(chunk["id"], "a", "job", "ACME LLC", rows)
+        self.wq.complete_name(chunk["id"], "a", "job", "ACME LLC", rows)
+        self.assertEqual(self.wq.results("job"), rows)
+
+    def test_expired_lease_is_taken_over(self):
+        chunk = self.wq.lease("a", lease_seconds=-1)
+        self.wq.complete_name(chunk["id"], "a", "job", "ACME LLC", [miss("ACME LLC", "No results")])
+
+        taken = self.wq.lease("b")
+        self.assertEqual((taken["id"], taken["attempts"]), (chunk["id"], 2))
+        self.assertEqual(self.wq.completed_names("job"), {"ACME LLC"})
+        with self.assertRaises(LeaseLost):
+            self.wq.complete_name(chunk["id"], "a", "job", "BETA INC", [miss("BETA INC", "No results")])
+
+        self.wq.complete_name(taken["id"], "b", "job", "BETA INC", [miss("BETA INC", "No results")])
+        self.wq.finish_chunk(taken["id"], "b")
+        progress = self.wq.job_progress("job")
+        self.assertEqual((progress["completed"], progress["finished"]), (2, True))
+        self.assertEqual(len(self.wq.results("job")), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
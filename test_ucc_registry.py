@@ -0,0 +1,64 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import ucc_registry
+from ucc_registry import ProcessRegistry
+
+# Exits a second after SIGTERM, so a blocking terminate would be visible
+SLOW_EXIT = ("import signal, sys, time; "
+             "signal.signal(signal.SIGTERM, lambda *a: (time.sleep(1), sys.exit(0))); "
+             "print('ready', flush=True); time.sleep(30)")
+
+
+class ProcessRegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.registry = ProcessRegistry(self.tmp)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write_heartbeat(self, pid, job_id):
+        with open(os.path.join(self.tmp, f"worker_{pid}.json"), 'w') as f:
+            json.dump({"pid": pid, "role": "worker", "job_id": job_id, "state": "Scraping",
+                       "started_at": time.time(), "heartbeat_at": time.time()}, f)
+
+    def test_jobs_found_by_refresh_are_trimmed(self):
+        for i in range(ucc_registry.MAX_TRACKED_JOBS + 50):
+            self.write_heartbeat(100000 + i, f"job{i}")
+        with mock.patch.object(ucc_registry, "pid_alive", return_value=True):
+            self.registry.refresh()
+        self.assertEqual(len(self.registry.snapshot()["jobs"]), ucc_registry.MAX_TRACKED_JOBS)
+
+    def test_terminate_returns_without_waiting(self):
+        proc = subprocess.Popen([sys.executable, "-c", SLOW_EXIT], stdout=subprocess.PIPE)
+        self.addCleanup(proc.kill)
+        proc.stdout.readline()
+        self.registry.register_child(proc, "worker")
+
+        start = time.monotonic()
+        self.assertEqual(self.registry.terminate("worker"), [proc.pid])
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertFalse(self.registry.is_alive("worker"))
+
+        # Still exiting: refresh keeps it out of the view until it is reaped
+        self.registry.refresh()
+        self.assertFalse(self.registry.is_alive("worker"))
+        deadline = time.monotonic() + 5
+        while proc.poll() is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.registry.refresh()
+        self.assertEqual(proc.returncode, 0)
+        self.assertTrue(self.registry.wait_exited([proc.pid], 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
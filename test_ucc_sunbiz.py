@@ -0,0 +1,196 @@
+import csv
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest import mock
+
+import hub_snapshots
+import ucc_http
+import ucc_sunbiz
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(ROOT, "fixtures", "sunbiz")
+SB_HUB = os.path.join("Data", "1. SB", "SB 33480 Palm Beach.csv")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+class ParseDetailTest(unittest.TestCase):
+    """parse_detail against saved search.sunbiz.org detail pages."""
+
+    def test_active_llc(self):
+        info = ucc_sunbiz.parse_detail(load_fixture("active_llc.html"))
+        self.assertTrue(info["found"])
+        self.assertEqual(info["entity_type"], "Florida Limited Liability Company")
+        self.assertEqual(info["name"], "SEAGRAPE HOLDINGS, LLC")
+        self.assertEqual(info["document_number"], "L15000012345")
+        self.assertEqual(info["fein"], "47-3012345")
+        self.assertEqual(info["date_filed"], "01/22/2015")
+        self.assertEqual(info["status"], "ACTIVE")
+        self.assertEqual(info["last_event"], "LC AMENDMENT")
+        self.assertEqual(info["principal_address"], "250 ROYAL PALM WAY\nSUITE 300\nPALM BEACH, FL 33480")
+        self.assertEqual(info["mailing_address"], "P.O. BOX 2246\nPALM BEACH, FL 33480")
+        self.assertEqual(info["registered_agent"], "CORPORATE AGENTS OF FLORIDA, INC.")
+        self.assertEqual(info["registered_agent_address"], "1200 N FLAGLER DR\nWEST PALM BEACH, FL 33401")
+        # LLCs list authorized persons; only the name is kept, not the address
+        self.assertEqual(info["officers"], [["MGR", "O'NEILL, MARGARET A"], ["AMBR", "O'NEILL, THOMAS"]])
+        self.assertEqual(info["annual_reports"], [["2022", "01/18/2022"], ["2023", "02/03/2023"], ["2024", "01/09/2024"]])
+
+    def test_inactive_corp_without_fein_or_officers(self):
+        info = ucc_sunbiz.parse_detail(load_fixture("inactive_corp.html"))
+        self.assertTrue(info["found"])
+        self.assertEqual(info["name"], "ATLANTIC MARINE SUPPLY & REPAIR, INC.")
+        self.assertEqual(info["fein"], "NONE")
+        self.assertEqual(info["status"], "INACTIVE")
+        self.assertEqual(info["officers"], [])
+        self.assertEqual(info["annual_reports"], [["2015", "04/27/2015"]])
+
+    def test_not_found(self):
+        info = ucc_sunbiz.parse_detail(load_fixture("not_found.html"))
+        self.assertFalse(info["found"])
+
+
+class EnrichmentRecordTest(unittest.TestCase):
+    candidate = {"doc": "L15000012345", "name": "SEAGRAPE HOLDINGS LLC", "link": "https://search.sunbiz.org/x",
+                 "missing": ["FEI/EIN Number", "Officers"]}
+
+    def test_found(self):
+        info = ucc_sunbiz.parse_detail(load_fixture("active_llc.html"))
+        record = dict(zip(ucc_sunbiz.FIELDNAMES, ucc_sunbiz.enrichment_record(self.candidate, info, "2026-01-01T00:00:00")))
+        self.assertEqual(record["Document Number"], "L15000012345")
+        self.assertEqual(record["Business Name"], "SEAGRAPE HOLDINGS, LLC")
+        self.assertEqual(record["Officers"], "MGR: O'NEILL, MARGARET A; AMBR: O'NEILL, THOMAS")
+        self.assertEqual(record["Last Annual Report"], "2024 (01/09/2024)")
+        self.assertEqual(record["Missing Fields"], "FEI/EIN Number, Officers")
+
+    def test_not_found(self):
+        info = ucc_sunbiz.parse_detail(load_fixture("not_found.html"))
+        record = ucc_sunbiz.enrichment_record(self.candidate, info, "2026-01-01T00:00:00")
+        self.assertEqual(len(record), len(ucc_sunbiz.FIELDNAMES))
+        self.assertEqual(record[ucc_sunbiz.FIELDNAMES.index("Sunbiz Status")], "Not found")
+
+    def test_keyed_on_the_hub_document_number(self):
+        # The TTL is keyed on the hub's number, so a page reporting another
+        # one must not change the key column
+        info = ucc_sunbiz.parse_detail(load_fixture("active_llc.html"))
+        record = dict(zip(ucc_sunbiz.FIELDNAMES, ucc_sunbiz.enrichment_record(
+            {**self.candidate, "doc": "L14000119816"}, info, "2026-01-01T00:00:00")))
+        self.assertEqual(record["Document Number"], "L14000119816")
+        self.assertEqual(record["Sunbiz Document Number"], "L15000012345")
+
+
+class HubTestCase(unittest.TestCase):
+    """Runs from the repo root with snapshots and their index in a scratch
+    directory, so public/snapshots is left alone."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(ROOT)
+        self.tmp = tempfile.mkdtemp()
+        self.output_file = os.path.join(self.tmp, "enrichment.csv")
+        snapshot_dir = os.path.join(self.tmp, "snapshots")
+        for patch in (mock.patch.object(hub_snapshots, "SNAPSHOT_DIR", snapshot_dir),
+                      mock.patch.object(hub_snapshots, "SNAPSHOT_INDEX", os.path.join(snapshot_dir, "index.json"))):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+
+
+class LoadCandidatesTest(HubTestCase):
+    """Hub type resolution for the files passed to load_candidates."""
+
+    def test_file_outside_data_needs_a_type(self):
+        path = os.path.join(self.tmp, "SB 33480 Palm Beach.csv")
+        shutil.copy(SB_HUB, path)
+        with self.assertRaises(ValueError):
+            ucc_sunbiz.load_candidates([path], output_file=self.output_file)
+
+        candidates = ucc_sunbiz.load_candidates([path], output_file=self.output_file, data_type="SB")
+        self.assertTrue(candidates)
+        self.assertTrue(all(c["doc"] and "SearchResultDetail" in c["link"] for c in candidates))
+
+    def test_explicit_non_sb_hub_is_rejected(self):
+        path = os.path.join(self.tmp, "YP 33480 Palm Beach.csv")
+        shutil.copy(SB_HUB, path)
+        with self.assertRaises(ValueError):
+            ucc_sunbiz.load_candidates([path], output_file=self.output_file, data_type="YP")
+
+
+class FixtureServer(BaseHTTPRequestHandler):
+    """Stands in for search.sunbiz.org: every detail page is active_llc.html,
+    whose document number matches none of the hub's."""
+    requests = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        FixtureServer.requests += 1
+        body = load_fixture("active_llc.html").encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class EnrichEndToEndTest(HubTestCase):
+    """load_candidates -> enrich_batch -> fetch_detail against a local server,
+    appending rows the way the worker does."""
+
+    def setUp(self):
+        super().setUp()
+        self.hub = os.path.join(self.tmp, "SB 33480 Palm Beach.csv")
+        shutil.copy(SB_HUB, self.hub)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureServer)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        base = mock.patch.object(ucc_sunbiz, "SUNBIZ_BASE", f"http://127.0.0.1:{server.server_port}")
+        base.start()
+        self.addCleanup(base.stop)
+        interval = ucc_http.DEFAULT_INTERVAL
+        ucc_http.set_interval(0)
+        self.addCleanup(ucc_http.set_interval, interval)
+        FixtureServer.requests = 0
+
+    def enrich(self):
+        candidates = ucc_sunbiz.load_candidates([self.hub], output_file=self.output_file, data_type="SB")
+        records = [r for c in range(0, len(candidates), ucc_sunbiz.BATCH_SIZE)
+                   for _, r in ucc_sunbiz.enrich_batch(candidates[c:c + ucc_sunbiz.BATCH_SIZE])]
+        new_file = not os.path.exists(self.output_file)
+        with open(self.output_file, 'a', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            if new_file: writer.writerow(ucc_sunbiz.FIELDNAMES)
+            writer.writerows(records)
+        return candidates
+
+    def test_rows_written_and_skipped_within_ttl(self):
+        candidates = self.enrich()
+        self.assertTrue(candidates)
+        self.assertEqual(FixtureServer.requests, len(candidates))
+
+        with open(self.output_file, encoding='utf-8', newline='') as f:
+            rows = [dict(zip(ucc_sunbiz.FIELDNAMES, r)) for r in list(csv.reader(f))[1:]]
+        self.assertEqual([r["Document Number"] for r in rows], [c["doc"] for c in candidates])
+        self.assertTrue(all(r["Sunbiz Document Number"] == "L15000012345" and r["FEI/EIN Number"] == "47-3012345"
+                            for r in rows))
+
+        # Every document was just enriched, so the second run fetches nothing
+        self.assertEqual(self.enrich(), [])
+        self.assertEqual(FixtureServer.requests, len(candidates))
+
+        # With no TTL they are all due again
+        self.assertEqual(len(ucc_sunbiz.load_candidates([self.hub], 0, self.output_file, "SB")), len(candidates))
+
+
+if __name__ == "__main__":
+    unittest.main()
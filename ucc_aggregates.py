@@ -0,0 +1,332 @@
+import csv
+import io
+import json
+import os
+import re
+import zlib
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import hub_snapshots
+from hub_layout import classify_csv
+
+DATA_ROOT = "Data"
+AGGREGATES_FILE = "public/aggregates.json"
+STATE_FILE = "public/.aggregates_state.json"
+TOP_SECURED_PARTIES = 25
+EXPIRING_WINDOWS = (30, 60, 90, 180)
+EXPIRES_HORIZON_DAYS = 365  # how far ahead the per-day expiry histogram is published
+HEAD_BYTES = 4096           # prefix fingerprinted to tell appends from rewrites
+STATE_VERSION = 3           # bump when layouts or counts change so old state is rebuilt
+
+UCC_STATUS_REGEX = re.compile(r'^(FILED|LAPSED)', re.IGNORECASE)
+
+# Snapshot fields (as named by the hub_mappings.json rules) that feed the counts
+LAYOUT_FIELDS = {
+    "UCC Status": "status", "Date Filed": "filed", "Expires": "expires", "Zip": "zip", "ZIP": "zip",
+    "Entity Type": "entity", "Sunbiz Status": "sunbiz_status", "Record Date": "record_date", "Doc Type": "doc_type",
+}
+SECURED_FIELD_REGEX = re.compile(r'^(Secured Party \d+ Name|Reverse Name|IndirectName)$')
+
+try:
+    import fcntl
+    lock_support = True
+except ImportError:
+    lock_support = False
+
+
+@lru_cache(maxsize=8192)
+def parse_date(value):
+    value = value.strip()
+    if not value:
+        return None
+    for fmt in ('%m/%d/%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            pass
+    return None
+
+
+def empty_counts():
+    return {"rows": 0, "status": {}, "secured_parties": {}, "expires": {}, "zips": {},
+            "sunbiz_status": {}, "entity_types": {}, "dated_zips": {}, "recent": {}}
+
+
+@lru_cache(maxsize=1)
+def hub_mappings():
+    return hub_snapshots.load_mappings()
+
+
+def sunbiz_status_map():
+    """The hub snapshots' spelling fixes for SunBiz status (ACTIVE -> Active, ...)."""
+    return hub_mappings().get("value_maps", {}).get("Sunbiz Status", {})
+
+
+def layout_for(data_type, first_row):
+    """Which columns carry status, lender, expiry, ... in a hub file, read off
+    the hub_mappings.json rule its snapshot is built with, so a new layout is
+    only ever described there. A field repeated in the headers resolves to
+    its last column, as it does in a snapshot row read as a dict."""
+    rule = hub_snapshots.select_rule(hub_mappings(), data_type, len(first_row))
+    headers, skip = hub_snapshots.resolve_headers(rule, first_row)
+    excluded = set(rule.get("not_aggregated", ()))
+    layout = {"header": skip, "secured": []}
+    for i, field in enumerate(headers):
+        if field in excluded:
+            continue
+        if field in LAYOUT_FIELDS:
+            layout[LAYOUT_FIELDS[field]] = i
+        elif SECURED_FIELD_REGEX.match(field):
+            layout["secured"].append(i)
+    return layout
+
+
+def add_rows(counts, rows, layout, zip_code):
+    status_idx = layout.get("status")
+    expires_idx = layout.get("expires")
+    zip_idx = layout.get("zip")
+    filed_idx = layout.get("filed")
+    entity_idx = layout.get("entity")
+    sunbiz_idx = layout.get("sunbiz_status")
+    sunbiz_map = sunbiz_status_map()
+    record_idx = layout.get("record_date")
+    doc_type_idx = layout.get("doc_type")
+    secured_idx = layout.get("secured", [])
+    status_counts = counts["status"]
+    secured_counts = counts["secured_parties"]
+    expires_counts = counts["expires"]
+    zip_counts = counts["zips"]
+    entity_counts = counts["entity_types"]
+    sunbiz_counts = counts["sunbiz_status"]
+    dated_zip_counts = counts["dated_zips"]
+    recent = counts["recent"]
+
+    for row in rows:
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        counts["rows"] += 1
+        width = len(row)
+
+        if status_idx is not None and status_idx < width:
+            status = row[status_idx].strip()
+            if status and (layout.get("header") or UCC_STATUS_REGEX.match(status)):
+                status_counts[status] = status_counts.get(status, 0) + 1
+
+        if expires_idx is not None and expires_idx < width:
+            expires = parse_date(row[expires_idx])
+            if expires:
+                expires_counts[expires] = expires_counts.get(expires, 0) + 1
+
+        for idx in secured_idx:
+            if idx < width:
+                name = row[idx].strip()
+                if name:
+                    secured_counts[name] = secured_counts.get(name, 0) + 1
+
+        if sunbiz_idx is not None and sunbiz_idx < width:
+            sunbiz = row[sunbiz_idx].strip()
+            if sunbiz:
+                sunbiz = sunbiz_map.get(sunbiz, sunbiz)
+                sunbiz_counts[sunbiz] = sunbiz_counts.get(sunbiz, 0) + 1
+
+        if entity_idx is not None and entity_idx < width:
+            entity = row[entity_idx].strip()
+            if entity:
+                entity_counts[entity] = entity_counts.get(entity, 0) + 1
+
+        # Recent filings keep lender and document type per record date, so a
+        # trailing window of any length can be summed without the rows
+        if record_idx is not None and record_idx < width:
+            recorded = parse_date(row[record_idx])
+            if recorded:
+                day = recent.setdefault(recorded, {"count": 0, "lenders": {}, "doc_types": {}})
+                day["count"] += 1
+                lender = row[secured_idx[0]].strip() if secured_idx and secured_idx[0] < width else ""
+                if lender:
+                    day["lenders"][lender] = day["lenders"].get(lender, 0) + 1
+                doc_type = row[doc_type_idx].strip() if doc_type_idx is not None and doc_type_idx < width else ""
+                if doc_type:
+                    day["doc_types"][doc_type] = day["doc_types"].get(doc_type, 0) + 1
+
+        row_zip = zip_code or (row[zip_idx].strip()[:5] if zip_idx is not None and zip_idx < width else "")
+        if row_zip:
+            zip_counts[row_zip] = zip_counts.get(row_zip, 0) + 1
+            if filed_idx is not None and filed_idx < width and row[filed_idx].strip():
+                dated_zip_counts[row_zip] = dated_zip_counts.get(row_zip, 0) + 1
+
+
+def head_fingerprint(f, length):
+    f.seek(0)
+    return zlib.crc32(f.read(min(length, HEAD_BYTES)))
+
+
+def scan_file(path, prev=None):
+    """Returns the aggregate state for one CSV, reading only the bytes appended
+    since `prev` when the file has merely grown."""
+    st = os.stat(path)
+    rel_dir = os.path.relpath(os.path.dirname(path), DATA_ROOT)
+    data_type, zip_code, location = classify_csv(rel_dir, os.path.basename(path))
+
+    with open(path, 'rb') as f:
+        # Writers hold LOCK_EX while appending, so a shared lock guarantees we
+        # never consume half a row.
+        if lock_support: fcntl.flock(f, fcntl.LOCK_SH)
+        try:
+            appended = (
+                prev is not None
+                and prev.get("ino") == st.st_ino
+                and st.st_size >= prev["offset"]
+                and head_fingerprint(f, prev["offset"]) == prev["head"]
+            )
+            if appended and st.st_size == prev["offset"]:
+                return prev
+
+            if appended:
+                state = prev
+                f.seek(prev["offset"])
+            else:
+                state = {"ino": st.st_ino, "type": data_type, "zip": zip_code, "location": location,
+                         "layout": None, "counts": empty_counts()}
+                f.seek(0)
+            raw = f.read()
+            offset = f.tell()
+            state["offset"] = offset
+            state["head"] = head_fingerprint(f, offset)
+        finally:
+            if lock_support: fcntl.flock(f, fcntl.LOCK_UN)
+
+    rows = csv.reader(io.StringIO(raw.decode('utf-8', errors='ignore'), newline=''))
+    if state["layout"] is None:
+        first_row = None
+        for row in rows:
+            if row and any(cell.strip() for cell in row):
+                first_row = row
+                break
+        if first_row is None:
+            state["offset"] = 0  # Nothing but blank lines yet; rescan from the top next time
+            return state
+        state["layout"] = layout_for(data_type, first_row)
+        if not state["layout"]["header"]:
+            add_rows(state["counts"], [first_row], state["layout"], zip_code)
+
+    add_rows(state["counts"], rows, state["layout"], zip_code)
+    return state
+
+
+def load_state():
+    if os.path.exists(STATE_FILE):
+        try:
+            with open(STATE_FILE, 'r') as f:
+                state = json.load(f)
+            # Layouts come from the mapping rules, so editing them rebuilds every file's counts
+            if state.get("version") == STATE_VERSION and state.get("mappings") == hub_mappings()["hash"]:
+                return state
+        except (OSError, ValueError):
+            pass
+    return {"version": STATE_VERSION, "mappings": hub_mappings()["hash"], "files": {}}
+
+
+def write_json_atomic(path, payload):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_file = path + ".tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    os.replace(temp_file, path)
+
+
+def expiring_counts(expires_by_date, today, windows=EXPIRING_WINDOWS):
+    result = {}
+    for days in windows:
+        end = (today + timedelta(days=days)).isoformat()
+        start = today.isoformat()
+        result[str(days)] = sum(n for d, n in expires_by_date.items() if start <= d <= end)
+    return result
+
+
+def build_aggregates(files, today=None):
+    today = today or date.today()
+    totals = empty_counts()
+    rows_by_type = {}
+    rows_by_location = {}
+
+    for state in files.values():
+        counts = state["counts"]
+        totals["rows"] += counts["rows"]
+        rows_by_type[state["type"]] = rows_by_type.get(state["type"], 0) + counts["rows"]
+        if state["location"] and counts["rows"]:
+            rows_by_location[state["location"]] = rows_by_location.get(state["location"], 0) + counts["rows"]
+        for key in ("status", "secured_parties", "expires", "zips", "sunbiz_status", "entity_types", "dated_zips"):
+            merged = totals[key]
+            for k, n in counts[key].items():
+                merged[k] = merged.get(k, 0) + n
+        for day, entry in counts["recent"].items():
+            merged = totals["recent"].setdefault(day, {"count": 0, "lenders": {}, "doc_types": {}})
+            merged["count"] += entry["count"]
+            for key in ("lenders", "doc_types"):
+                for k, n in entry[key].items():
+                    merged[key][k] = merged[key].get(k, 0) + n
+
+    horizon = (today + timedelta(days=EXPIRES_HORIZON_DAYS)).isoformat()
+    upcoming = {d: n for d, n in sorted(totals["expires"].items()) if today.isoformat() <= d <= horizon}
+    top_secured = sorted(totals["secured_parties"].items(), key=lambda kv: kv[1], reverse=True)[:TOP_SECURED_PARTIES]
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "as_of": today.isoformat(),
+        "total_rows": totals["rows"],
+        "rows_by_type": rows_by_type,
+        "status_counts": dict(sorted(totals["status"].items(), key=lambda kv: kv[1], reverse=True)),
+        "top_secured_parties": [{"name": name, "value": n} for name, n in top_secured],
+        "expiring": expiring_counts(upcoming, today),
+        "expires_by_date": upcoming,
+        "zip_counts": dict(sorted(totals["zips"].items(), key=lambda kv: kv[1], reverse=True)),
+        "dated_zip_counts": totals["dated_zips"],
+        "rows_by_location": dict(sorted(rows_by_location.items(), key=lambda kv: kv[1], reverse=True)),
+        "sunbiz_status_counts": dict(sorted(totals["sunbiz_status"].items(), key=lambda kv: kv[1], reverse=True)),
+        "entity_type_counts": dict(sorted(totals["entity_types"].items(), key=lambda kv: kv[1], reverse=True)),
+        "recent_filings": dict(sorted(totals["recent"].items())),
+    }
+
+
+def refresh_aggregates(paths=None):
+    """Folds changed CSVs into the materialized aggregates.
+
+    With `paths`, only those files are rescanned (the worker passes the file it
+    just appended to). Without, every CSV under Data/ is checked and files that
+    disappeared are dropped.
+    """
+    os.makedirs(os.path.dirname(STATE_FILE) or '.', exist_ok=True)
+    with open(STATE_FILE + ".lock", 'w') as lock:
+        if lock_support: fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            state = load_state()
+            files = state["files"]
+
+            if paths is None:
+                paths = []
+                for root, _, names in os.walk(DATA_ROOT):
+                    paths.extend(os.path.join(root, n) for n in names if n.endswith('.csv'))
+                for stale in set(files) - set(paths):
+                    del files[stale]
+
+            for path in paths:
+                if not os.path.isfile(path):
+                    files.pop(path, None)
+                    continue
+                try:
+                    files[path] = scan_file(path, files.get(path))
+                except OSError as e:
+                    print(f"Error aggregating {path}: {e}")
+
+            aggregates = build_aggregates(files)
+            write_json_atomic(STATE_FILE, state)
+            write_json_atomic(AGGREGATES_FILE, aggregates)
+            return aggregates
+        finally:
+            if lock_support: fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+if __name__ == "__main__":
+    result = refresh_aggregates()
+    print(f"Aggregated {result['total_rows']} rows into {AGGREGATES_FILE}.")
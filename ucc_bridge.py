@@ -4,7 +4,14 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import json
 import os
+import subprocess
+import sys
+import threading
 from werkzeug.utils import secure_filename
+from datetime import date
+from ucc_aggregates import AGGREGATES_FILE, EXPIRING_WINDOWS, EXPIRES_HORIZON_DAYS, expiring_counts
+from ucc_registry import ProcessRegistry
+from ucc_watcher import update_pending_jobs
 
 app = Flask(__name__)
 CORS(app)
@@ -12,6 +19,16 @@ CORS(app)
 UPLOAD_FOLDER = "public/Uploads"
 COMMANDS_DIR = os.path.join(UPLOAD_FOLDER, "Commands")
 STAGING_DIR = os.path.join(UPLOAD_FOLDER, "Staging")
+BRIDGE_THREADS = int(os.environ.get("UCC_BRIDGE_THREADS", "16"))
+RESTART_GRACE_SECONDS = 10  # how long a restart waits for the old watcher to exit before launching anyway
+
+# Watcher/worker PIDs, states and heartbeats, kept in memory so status and
+# control endpoints never have to fork pgrep/pkill. Started at import so it
+# is populated however the app is served (e.g. waitress-serve ucc_bridge:app).
+registry = ProcessRegistry().start()
+
+# Parsed aggregates.json, reloaded only when the file changes
+aggregates_cache = {"mtime": None, "data": None}
 
 # Ensure directories exist
 for d in [UPLOAD_FOLDER, COMMANDS_DIR, STAGING_DIR]:
@@ -67,6 +84,7 @@ def manual_search():
 
     with open(cmd_filepath, 'w') as f:
         json.dump(cmd_data, f)
+    registry.record_job(job_id)
 
     return jsonify({
         "status": "Manual search triggered",
@@ -113,14 +131,15 @@ def handle_command():
 
     with open(filepath, 'w') as f:
         json.dump(data, f)
+    registry.record_job(job_id)
 
     return jsonify({"status": "Command received", "file": filepath}), 200
 
 @app.route('/stop', methods=['POST'])
 def stop_all_scrapes():
     try:
-        # Kill any running worker processes
-        os.system("pkill -f ucc_worker.py")
+        # Terminate any running worker processes known to the registry
+        stopped = registry.terminate("worker")
         # Also clear any pending commands in the Commands directory to prevent restart
         for f in os.listdir(COMMANDS_DIR):
             if f.endswith('.json'):
@@ -128,7 +147,7 @@ def stop_all_scrapes():
                     os.remove(os.path.join(COMMANDS_DIR, f))
                 except:
                     pass
-        return jsonify({"status": "All scrapes stopped and commands cleared"}), 200
+        return jsonify({"status": "All scrapes stopped and commands cleared", "stopped": stopped}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -145,7 +164,7 @@ def delete_pending():
         try:
             os.remove(filepath)
             # Update the pending jobs file immediately
-            os.system("python3 -c \"from ucc_watcher import update_pending_jobs; update_pending_jobs()\"")
+            update_pending_jobs()
             return jsonify({"status": f"Deleted {filename}"}), 200
         except Exception as e:
             return jsonify({"error": str(e)}), 500
@@ -153,37 +172,71 @@ def delete_pending():
 
 @app.route('/system/status', methods=['GET'])
 def system_status():
-    watcher_alive = False
-    worker_alive = False
-    try:
-        # Check if ucc_watcher.py is running
-        if os.popen("pgrep -f ucc_watcher.py").read().strip():
-            watcher_alive = True
-        # Check if ucc_worker.py is running
-        if os.popen("pgrep -f ucc_worker.py").read().strip():
-            worker_alive = True
-    except:
-        pass
-
     return jsonify({
         "bridge": "online",
-        "watcher": "online" if watcher_alive else "offline",
-        "worker": "active" if worker_alive else "idle",
+        "watcher": "online" if registry.is_alive("watcher") else "offline",
+        "worker": "active" if registry.is_busy("worker") else "idle",
         "timestamp": time.time()
     }), 200
 
+@app.route('/system/processes', methods=['GET'])
+def system_processes():
+    return jsonify(registry.snapshot()), 200
+
+@app.route('/aggregates', methods=['GET'])
+def get_aggregates():
+    try:
+        mtime = os.path.getmtime(AGGREGATES_FILE)
+    except OSError:
+        return jsonify({"error": "Aggregates not generated yet"}), 404
+
+    if aggregates_cache["mtime"] != mtime:
+        with open(AGGREGATES_FILE, 'r') as f:
+            aggregates_cache["data"] = json.load(f)
+        aggregates_cache["mtime"] = mtime
+
+    windows = list(EXPIRING_WINDOWS)
+    days = request.args.get('days', type=int)
+    if days and days > EXPIRES_HORIZON_DAYS:
+        # expires_by_date only reaches this far ahead; a longer window would undercount
+        return jsonify({"error": f"days must be at most {EXPIRES_HORIZON_DAYS}"}), 400
+    if days and days > 0:
+        windows.append(days)
+
+    data = aggregates_cache["data"]
+    # Expiry windows are relative to today, not to when the artifact was built
+    return jsonify({**data, "expiring": expiring_counts(data.get("expires_by_date", {}), date.today(), windows)}), 200
+
+restart_lock = threading.Lock()
+
+def launch_watcher(stopping):
+    registry.wait_exited(stopping, RESTART_GRACE_SECONDS)
+    with restart_lock:
+        # Back-to-back restarts each start a thread; only the first launches
+        if registry.is_alive("watcher"): return
+        with open("watcher_output.log", 'w') as log:
+            proc = subprocess.Popen([sys.executable, "ucc_watcher.py"], stdout=log, stderr=subprocess.STDOUT)
+        registry.register_child(proc, "watcher")
+
 @app.route('/system/restart', methods=['POST'])
 def system_restart():
     try:
-        # Restart the watcher
-        os.system("pkill -f ucc_watcher.py")
-        os.system("pkill -f ucc_worker.py")
-        time.sleep(1)
-        os.system("python3 ucc_watcher.py > watcher_output.log 2>&1 &")
+        # Restart the watcher once the old one has exited, off the request thread
+        stopping = registry.terminate("watcher") + registry.terminate("worker")
+        threading.Thread(target=launch_watcher, args=(stopping,), daemon=True).start()
 
         return jsonify({"status": "Watcher restart triggered"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 if __name__ == "__main__":
-    app.run(host='0.0.0.0', port=5001)
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+
+    if serve:
+        serve(app, host='0.0.0.0', port=5001, threads=BRIDGE_THREADS)
+    else:
+        print("waitress not installed, falling back to Flask's threaded server")
+        app.run(host='0.0.0.0', port=5001, threaded=True)
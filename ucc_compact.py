@@ -0,0 +1,189 @@
+import csv
+import itertools
+import json
+import os
+import re
+import sys
+import time
+
+from ucc_aggregates import write_json_atomic
+from ucc_records import FIELDNAMES, FIELD_INDEX
+
+OUTPUT_FILE = "Data/UCC Results/all_results.csv"
+COMPACTION_DIR = "public/Uploads/.compaction"
+MIN_TAIL_BYTES = 1024 * 1024  # skip a scheduled run until this much was appended since the last generation
+
+SEARCH_TERM = FIELD_INDEX["Search Term"]
+STATUS = FIELD_INDEX["Status"]
+UCC_NUMBER = FIELD_INDEX["UCC Number"]
+
+try:
+    import fcntl
+    lock_support = True
+except ImportError:
+    lock_support = False
+
+
+def load_json(path, default):
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return default
+
+
+def compaction_file(output_file, kind):
+    """Bookkeeping file of one compacted output, e.g. its generation state or
+    negative lookups; every output keeps its own."""
+    slug = re.sub(r'[^\w.-]+', '_', os.path.relpath(output_file))
+    return os.path.join(COMPACTION_DIR, f"{slug}.{kind}")
+
+
+def load_negative_lookups(output_file=OUTPUT_FILE):
+    """{search term: {"misses": n, "generation": g}} for names whose searches
+    since their last match (if any) came back with no results, as folded out
+    of `output_file`."""
+    return load_json(compaction_file(output_file, "no_results.json"), {})
+
+
+def prefix_lines(f, limit):
+    """Lines of the next `limit` bytes of `f`; reads nothing past them, so
+    consecutive calls walk consecutive segments."""
+    consumed = 0
+    while consumed < limit:
+        line = f.readline()
+        if not line:
+            break
+        consumed += len(line)
+        yield line.decode('utf-8', errors='ignore')
+
+
+def fold_rows(rows, negative, generation, settled=()):
+    """Latest row per (UCC Number, Search Term), in the order each key was
+    last written. 'No results' rows are moved into `negative`. A match
+    supersedes the name's earlier misses but not the ones written after it.
+    `settled` rows, read first, are an earlier generation's output: the
+    misses already in `negative` are newer than their matches."""
+    latest = {}
+    tagged = itertools.chain(((True, row) for row in settled), ((False, row) for row in rows))
+    for in_base, row in tagged:
+        if len(row) != len(FIELDNAMES) or row[SEARCH_TERM] == "Search Term":
+            continue  # torn line from a crashed writer, or a stray header
+        name = row[SEARCH_TERM]
+        if row[UCC_NUMBER]:
+            if not in_base: negative.pop(name, None)
+            latest.pop(("", name), None)
+        elif row[STATUS] == "No results":
+            entry = negative.setdefault(name, {"misses": 0})
+            entry["misses"] += 1
+            entry["generation"] = generation
+            latest.pop(("", name), None)
+            continue
+
+        key = (row[UCC_NUMBER], name)
+        latest.pop(key, None)
+        latest[key] = row
+
+    return list(latest.values())
+
+
+def compact_results(output_file, min_tail_bytes=0):
+    """Rewrites `output_file` keeping the latest row per filing.
+
+    The file is treated as segments: the prefix present when the run starts
+    is streamed and compacted without blocking writers; rows appended
+    meanwhile are copied over verbatim under the writers' lock, and the new
+    generation is swapped in with os.replace while that lock is held.
+    Writers re-check the inode after locking, so none append to the old file.
+
+    Returns a stats dict, or None if there was nothing to do.
+    """
+    if not os.path.exists(output_file):
+        return None
+    os.makedirs(COMPACTION_DIR, exist_ok=True)
+    state_file = compaction_file(output_file, "state.json")
+    state = load_json(state_file, {"generation": 0, "base_bytes": 0})
+
+    with open(compaction_file(output_file, "lock"), 'w') as run_lock:
+        if lock_support:
+            try:
+                fcntl.flock(run_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                print("Compaction already running, skipping.")
+                return None
+
+        with open(output_file, 'rb') as live:
+            # Writers append whole batches under LOCK_EX, so a size read under
+            # LOCK_SH always falls on a row boundary
+            if lock_support: fcntl.flock(live, fcntl.LOCK_SH)
+            st = os.fstat(live.fileno())
+            if lock_support: fcntl.flock(live, fcntl.LOCK_UN)
+            prefix = st.st_size
+
+            base = state["base_bytes"] if state.get("inode") == st.st_ino else 0
+            if prefix - base < min_tail_bytes:
+                return None
+
+            started = time.time()
+            generation = state["generation"] + 1
+            negative = load_negative_lookups(output_file)
+            settled = csv.reader(prefix_lines(live, base))
+            rows = csv.reader(prefix_lines(live, prefix - base))
+            kept = fold_rows(rows, negative, generation, settled)
+
+            temp_file = f"{output_file}.gen{generation}.tmp"
+            with open(temp_file, 'w', newline='', encoding='utf-8') as out:
+                writer = csv.writer(out)
+                writer.writerow(FIELDNAMES)
+                writer.writerows(kept)
+                out.flush()
+                base_bytes = os.fstat(out.fileno()).st_size
+
+                # Published first: if we crash before the swap, the misses are
+                # only counted twice, never lost
+                write_json_atomic(compaction_file(output_file, "no_results.json"), negative)
+
+                if lock_support: fcntl.flock(live, fcntl.LOCK_EX)
+                try:
+                    current = os.fstat(live.fileno()).st_size
+                    if current < prefix:
+                        # A crashed batch was truncated under us; start over next time
+                        os.remove(temp_file)
+                        return None
+                    live.seek(prefix)
+                    out.buffer.write(live.read())
+                    out.flush()
+                    os.fsync(out.fileno())
+                    after = os.fstat(out.fileno()).st_size
+                    os.replace(temp_file, output_file)
+                    new_inode = os.stat(output_file).st_ino
+                finally:
+                    if lock_support: fcntl.flock(live, fcntl.LOCK_UN)
+
+    stats = {
+        "generation": generation,
+        "inode": new_inode,
+        "base_bytes": base_bytes,
+        "bytes_before": current,
+        "bytes_after": after,
+        "bytes_reclaimed": current - after,
+        "rows_kept": len(kept),
+        "negative_lookups": len(negative),
+        "seconds": round(time.time() - started, 2),
+        "compacted_at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    write_json_atomic(state_file, stats)
+    return stats
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else OUTPUT_FILE
+    result = compact_results(path)
+    if result:
+        print(f"Generation {result['generation']}: {result['bytes_before']} -> {result['bytes_after']} bytes "
+              f"({result['bytes_reclaimed']} reclaimed), {result['rows_kept']} rows kept, "
+              f"{result['negative_lookups']} names in the no-results table.")
+    else:
+        print("Nothing to compact.")
@@ -0,0 +1,77 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_SIZE = 4             # keep-alive connections per host, shared by every source in the process
+REQUEST_TIMEOUT = 30
+BACKOFF_SECONDS = (10, 30)  # randomized wait after an error before retrying
+
+
+class RateLimiter:
+    """Spaces request starts at least `interval` seconds apart. Thread-safe,
+    so concurrent fetches through the pool still respect the site's pacing."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.next_at = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            if self.next_at > now:
+                time.sleep(self.next_at - now)
+                now = self.next_at
+            self.next_at = now + self.interval
+
+
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+DEFAULT_INTERVAL = 2.0
+
+
+def limiter_for(url):
+    """One limiter per host: the UCC API and SunBiz are paced independently."""
+    host = urlsplit(url).netloc
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = RateLimiter(DEFAULT_INTERVAL)
+        return _limiters[host]
+
+
+def set_interval(seconds):
+    """Sets the pacing for every host, including ones not contacted yet."""
+    global DEFAULT_INTERVAL
+    with _limiters_lock:
+        DEFAULT_INTERVAL = seconds
+        for limiter in _limiters.values():
+            limiter.interval = seconds
+
+
+def get(url, params=None, retries=3, what="request", on_error=None, paced=True):
+    """Paced GET with retries over the shared session. Returns the 200
+    response, or None once `retries` attempts have failed. Sequential callers
+    that pace themselves after each response pass `paced=False`."""
+    limiter = limiter_for(url) if paced else None
+    for attempt in range(retries):
+        if limiter: limiter.wait()
+        try:
+            resp = SESSION.get(url, params=params, timeout=REQUEST_TIMEOUT)
+            if resp.status_code == 200:
+                return resp
+            msg = f"API error {resp.status_code} on {what}, retrying ({attempt+1}/{retries})..."
+        except requests.RequestException as e:
+            msg = f"Exception during {what}: {e}, retrying..."
+        print(f"    {msg}")
+        if on_error: on_error(msg)
+        time.sleep(random.randint(*BACKOFF_SECONDS))
+    return None
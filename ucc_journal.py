@@ -0,0 +1,224 @@
+import csv
+import io
+import json
+import os
+import zlib
+
+from ucc_compact import load_negative_lookups
+
+JOURNAL_FSYNC = True        # fsync every record; a crash then loses at most the in-flight request
+COMPACT_EVERY = 500         # extra records tolerated on top of one per completed name before compacting
+
+try:
+    import fcntl
+    lock_support = True
+except ImportError:
+    lock_support = False
+
+
+class ScrapeJournal:
+    """Append-only write-ahead journal for one scrape job.
+
+    Records, one JSON object per line:
+      search  - the debtor list returned for a name
+      details - the filing details returned for (name, row number)
+      response - any other source's parsed response for (name, key)
+      write   - intent to append a name's rows: output inode, offset, length, crc,
+                plus `names` when one append carries the rows of several names
+      commit  - the name's (or the batch's) rows are in the output file
+      done    - compacted form of a committed name
+
+    Replaying the journal gives back every completed API response, so a
+    resumed job repeats none of them, and tells which names are fully in the
+    output. A write with no commit is settled against the output file itself
+    (`recover`), so rows are neither lost nor appended twice.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.searches = {}
+        self.details = {}
+        self.responses = {}
+        self.pending = {}      # name -> write intent without a commit
+        self.completed = set()
+        self.appended = 0
+        self._replay()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.f = open(path, 'a', encoding='utf-8')
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        good = 0
+        with open(self.path, 'r+b') as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    break
+                self._apply(rec)
+                good += len(line)
+            # Drop a torn final record from a crash mid-write so new records start on a clean line
+            f.truncate(good)
+
+    def _apply(self, rec):
+        kind, name = rec["t"], rec["name"]
+        if kind == "search":
+            self.searches[name] = rec["debtors"]
+        elif kind == "details":
+            self.details[(name, rec["row"])] = rec["details"]
+        elif kind == "response":
+            self.responses[(name, rec["key"])] = rec["body"]
+        elif kind == "write":
+            self.pending[name] = rec
+        elif kind in ("commit", "done"):
+            for member in self.pending.pop(name, {}).get("names", [name]):
+                self.completed.add(member)
+                self._forget(member)
+
+    def _forget(self, name):
+        self.searches.pop(name, None)
+        for key in [k for k in self.details if k[0] == name]:
+            del self.details[key]
+        for key in [k for k in self.responses if k[0] == name]:
+            del self.responses[key]
+
+    def _append(self, rec):
+        self.f.write(json.dumps(rec, separators=(',', ':')) + "\n")
+        self.f.flush()
+        if JOURNAL_FSYNC: os.fsync(self.f.fileno())
+        self._apply(rec)
+        self.appended += 1
+
+    def close(self):
+        self.f.close()
+
+    # API responses
+
+    def search(self, name, fetch):
+        if name in self.searches:
+            return self.searches[name], True
+        debtors = fetch(name)
+        self._append({"t": "search", "name": name, "debtors": debtors})
+        return debtors, False
+
+    def filing_details(self, name, row_number, fetch):
+        key = (name, row_number)
+        if key in self.details:
+            return self.details[key], True
+        details = fetch(row_number, name)
+        self._append({"t": "details", "name": name, "row": row_number, "details": details})
+        return details, False
+
+    def response(self, name, key, fetch):
+        """Generic cache for sources other than the UCC API. `fetch()` must
+        return something JSON-serializable; only successful fetches should be
+        recorded, so callers return None for failures and retry them later."""
+        if (name, key) in self.responses:
+            return self.responses[(name, key)], True
+        body = fetch()
+        if body is not None:
+            self._append({"t": "response", "name": name, "key": key, "body": body})
+        return body, False
+
+    # Output batches
+
+    def begin_write(self, name, f, payload, names=None):
+        """Called with the output file open and locked, right before `payload`
+        is appended at the current end of file. `names` lists every name whose
+        rows the payload carries when it is a batch; committing `name` then
+        completes all of them."""
+        st = os.fstat(f.fileno())
+        rec = {
+            "t": "write", "name": name, "ino": st.st_ino, "offset": st.st_size,
+            "length": len(payload), "crc": zlib.crc32(payload), "payload": payload.decode('utf-8'),
+        }
+        if names is not None: rec["names"] = list(names)
+        self._append(rec)
+
+    def commit(self, name):
+        self._append({"t": "commit", "name": name})
+        # Compacted size grows with the job, so scale the threshold to keep compaction amortized O(1)
+        if self.appended >= COMPACT_EVERY + len(self.completed):
+            self.compact()
+
+    def recover(self, output_file):
+        """Settles write intents left by a crash. Returns the names whose rows
+        must be written again (the rest are committed in place); a batch that
+        has to be redone returns all of its names."""
+        redo = []
+        for name, rec in list(self.pending.items()):
+            if settle_batch(output_file, rec):
+                self.commit(name)
+            else:
+                redo.extend(rec.get("names", [name]))
+                del self.pending[name]
+        return redo
+
+    def compact(self):
+        """Rewrites the journal as one `done` per committed name plus the API
+        responses of names still in progress."""
+        temp_file = self.path + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            for name in self.completed:
+                f.write(json.dumps({"t": "done", "name": name}, separators=(',', ':')) + "\n")
+            for name, debtors in self.searches.items():
+                f.write(json.dumps({"t": "search", "name": name, "debtors": debtors}, separators=(',', ':')) + "\n")
+            for (name, row_number), details in self.details.items():
+                f.write(json.dumps({"t": "details", "name": name, "row": row_number, "details": details}, separators=(',', ':')) + "\n")
+            for (name, key), body in self.responses.items():
+                f.write(json.dumps({"t": "response", "name": name, "key": key, "body": body}, separators=(',', ':')) + "\n")
+            for rec in self.pending.values():
+                f.write(json.dumps(rec, separators=(',', ':')) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.path)
+        self.f.close()
+        self.f = open(self.path, 'a', encoding='utf-8')
+        self.appended = 0
+
+
+def settle_batch(output_file, rec):
+    """True if the rows of a write intent are in the output file. If they are
+    not, whatever part of them the interrupted write left behind is made
+    inert so the rows can be appended again cleanly: cut off when it is the
+    file's tail, blanked in place when later appends follow it."""
+    if not os.path.exists(output_file):
+        return False
+    with open(output_file, 'r+b') as f:
+        if lock_support: fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            st = os.fstat(f.fileno())
+            if st.st_ino != rec["ino"]:
+                # The file was rewritten since (compacted); look for the rows themselves.
+                # Compaction moves 'No results' rows into the negative-lookup table.
+                negative = load_negative_lookups(output_file)
+                wanted = {(r[0], r[6]) for r in csv.reader(io.StringIO(rec["payload"], newline=''))
+                          if len(r) > 6 and not (r[2] == "No results" and r[0] in negative)}
+                text = io.TextIOWrapper(f, encoding='utf-8', errors='ignore', newline='')
+                found = {(r[0], r[6]) for r in csv.reader(text) if len(r) > 6}
+                text.detach()
+                return wanted <= found
+
+            f.seek(rec["offset"])
+            written = f.read(rec["length"])
+            if zlib.crc32(written) == rec["crc"]:
+                return True
+            # A torn write leaves a prefix of the payload at the offset
+            payload = rec["payload"].encode('utf-8')
+            torn = next((i for i, (a, b) in enumerate(zip(written, payload)) if a != b), len(written))
+            if torn == 0:
+                return False
+            if rec["offset"] + torn == st.st_size:
+                f.truncate(rec["offset"])
+            else:
+                # Another writer appended after the fragment: overwrite it with a
+                # whitespace line, which every reader skips, so its rows are not
+                # counted and the next row starts on a line of its own
+                f.seek(rec["offset"])
+                f.write(b" " * (torn - 1) + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+            return False
+        finally:
+            if lock_support: fcntl.flock(f, fcntl.LOCK_UN)
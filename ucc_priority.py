@@ -0,0 +1,150 @@
+import json
+import os
+import re
+
+from hub_layout import classify_csv
+import hub_snapshots
+from ucc_compact import load_negative_lookups
+
+DATA_ROOT = "Data"
+
+# Points per local signal. Names are scraped highest total first.
+SIGNAL_WEIGHTS = {
+    "recent_filing": 40,    # debtor on a recent county UCC filing ("Last 90 Days")
+    "ucc_hub": 20,          # already in the 3. UCC hub
+    "filed": 15,            # a hub shows an open (Filed) UCC
+    "active": 20,           # SunBiz status Active
+    "inactive": -25,        # SunBiz status inactive/dissolved
+    "business_entity": 10,  # profit corporation or LLC
+    "nonprofit": -15,
+    "prior_match": 30,      # scaled by the best prior match score
+    "prior_miss": -20,      # earlier scrapes found nothing for the name
+}
+
+ENTITY_SUFFIX_REGEX = re.compile(
+    r'\b(INC|INCORPORATED|LLC|L L C|CORP|CORPORATION|CO|COMPANY|LTD|LIMITED|PA|P A|LLP|PLLC)$'
+)
+INACTIVE_REGEX = re.compile(r'^(INACT|DISS|DELQ|UA|REVOKED|ADMIN)', re.IGNORECASE)
+
+
+def name_key(name):
+    """Loose identity for joining a search term against hub rows: case,
+    punctuation and a trailing entity suffix are ignored."""
+    key = re.sub(r'[^A-Z0-9 ]', ' ', name.upper())
+    key = ' '.join(key.split())
+    stripped = ENTITY_SUFFIX_REGEX.sub('', key).strip()
+    return stripped or key
+
+
+def parse_score(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def fold_row(signals, data_type, row):
+    name = row.get("businessName") or ""
+    if not name:
+        return
+    for part in name.split('\n'):
+        if not part.strip():
+            continue
+        s = signals.setdefault(name_key(part), {})
+
+        if data_type == "Last 90 Days":
+            s["recent_filing"] = True
+        if data_type == "3. UCC":
+            s["ucc_hub"] = True
+
+        ucc_status = row.get("UCC Status") or ""
+        if ucc_status.upper().startswith("FILED"):
+            s["filed"] = True
+
+        sunbiz_status = row.get("Sunbiz Status") or ""
+        if sunbiz_status.upper().startswith("ACTIVE"):
+            s["active"] = True
+        elif INACTIVE_REGEX.match(sunbiz_status):
+            s["inactive"] = True
+
+        entity = (row.get("Entity Type") or "").lower()
+        if "non-profit" in entity or "nonprofit" in entity:
+            s["nonprofit"] = True
+        elif "profit" in entity or "limited liability" in entity:
+            s["business_entity"] = True
+
+        if "Match Score" in row:
+            score = parse_score(row["Match Score"])
+            if row.get("UCC Number"):
+                s["prior_match"] = max(s.get("prior_match", 0.0), score)
+            elif ucc_status in ("No results", "No close match"):
+                s["prior_miss"] = True
+
+
+def load_signals(data_root=DATA_ROOT):
+    """Builds {name_key: signals} from every hub under Data/, reading the
+    normalized snapshots so each hub's columns line up the same way."""
+    config = hub_snapshots.load_mappings()
+    index = hub_snapshots.load_index()
+    signals = {}
+    folded_misses = set()
+
+    for root, _, files in os.walk(data_root):
+        rel_dir = os.path.relpath(root, data_root)
+        for file in files:
+            if not file.endswith('.csv'):
+                continue
+            path = os.path.join(root, file)
+            folded_misses.update(load_negative_lookups(path))
+            data_type, zip_code, location = classify_csv(rel_dir, file)
+            try:
+                snapshot_path = os.path.join('public', hub_snapshots.ensure_snapshot(
+                    path, data_type, zip_code, location, config, index
+                ))
+                with open(snapshot_path, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Skipping {path} for prioritization: {e}")
+                continue
+
+            columns = snapshot["columns"]
+            for values in snapshot["rows"]:
+                fold_row(signals, data_type, dict(zip(columns, values)))
+
+    hub_snapshots.save_index(index)
+
+    # Misses that compaction folded out of the results files
+    for name in folded_misses:
+        s = signals.setdefault(name_key(name), {})
+        if not s.get("prior_match"):
+            s["prior_miss"] = True
+    return signals
+
+
+def priority_score(s):
+    total = 0.0
+    for signal, present in s.items():
+        if signal == "prior_match":
+            total += SIGNAL_WEIGHTS[signal] * present
+        elif present:
+            total += SIGNAL_WEIGHTS[signal]
+    # An old miss doesn't count against a name that has matched since
+    if s.get("prior_miss") and s.get("prior_match"):
+        total -= SIGNAL_WEIGHTS["prior_miss"]
+    return total
+
+
+def rank_names(names, signals=None):
+    """Returns (names, scores) with the names deduplicated and ordered most
+    valuable first. Ties keep their input order."""
+    if signals is None:
+        signals = load_signals()
+    seen = set()
+    unique = []
+    for name in names:
+        if name not in seen:
+            seen.add(name)
+            unique.append(name)
+
+    scores = {name: priority_score(signals.get(name_key(name), {})) for name in unique}
+    return sorted(unique, key=lambda n: -scores[n]), scores
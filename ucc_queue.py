@@ -0,0 +1,217 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+QUEUE_FILE = "public/Uploads/.queue/work_queue.db"
+CHUNK_SIZE = 25        # names per leased chunk
+LEASE_SECONDS = 120    # a chunk not heartbeated for this long is handed to another node
+NODE_TTL = 60          # nodes silent for this long have their leases released early
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    filename TEXT,
+    threshold REAL,
+    mode TEXT,
+    total INTEGER,
+    created_at REAL,
+    merged INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT,
+    seq INTEGER,
+    names TEXT,
+    state TEXT DEFAULT 'pending',
+    lease_owner TEXT,
+    lease_expires REAL DEFAULT 0,
+    attempts INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS chunks_state ON chunks (state, lease_expires);
+CREATE TABLE IF NOT EXISTS completed (
+    job_id TEXT,
+    name TEXT,
+    node_id TEXT,
+    completed_at REAL,
+    PRIMARY KEY (job_id, name)
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT,
+    search_term TEXT,
+    seq INTEGER,
+    row TEXT,
+    UNIQUE (job_id, search_term, seq)
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    node_id TEXT PRIMARY KEY,
+    pid INTEGER,
+    heartbeat_at REAL
+);
+"""
+
+
+class LeaseLost(Exception):
+    """Raised when a node tries to commit work for a chunk it no longer holds."""
+
+
+class WorkQueue:
+    """SQLite-backed queue of name chunks shared by several worker nodes.
+
+    Chunks are leased, kept alive by node heartbeats and handed to another node
+    once the lease expires. Each completed name is committed together with its
+    result rows, so a re-leased chunk skips names that already finished and the
+    results table never holds a name's rows twice. Rows are keyed by their
+    position among the name's rows rather than by UCC number, so a name's
+    blank-numbered rows (several "No results" or unmatched debtors) are all
+    kept, as the single-process writer keeps them.
+    """
+
+    def __init__(self, path=QUEUE_FILE):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front so two nodes can't lease the same chunk
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def enqueue_job(self, job_id, names, filename="", threshold=0.7, mode="standard", chunk_size=CHUNK_SIZE):
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM jobs WHERE job_id = ?", (job_id,)).fetchone():
+                return
+            conn.execute(
+                "INSERT INTO jobs (job_id, filename, threshold, mode, total, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, filename, threshold, mode, len(names), time.time()),
+            )
+            conn.executemany(
+                "INSERT INTO chunks (job_id, seq, names) VALUES (?, ?, ?)",
+                [(job_id, seq, json.dumps(names[i:i + chunk_size]))
+                 for seq, i in enumerate(range(0, len(names), chunk_size))],
+            )
+
+    def lease(self, node_id, lease_seconds=LEASE_SECONDS):
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                """SELECT c.id, c.job_id, c.names, c.attempts, j.threshold, j.mode FROM chunks c
+                   JOIN jobs j ON j.job_id = c.job_id
+                   WHERE c.state = 'pending' OR (c.state = 'leased' AND c.lease_expires < ?)
+                   ORDER BY c.id LIMIT 1""",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE chunks SET state = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (node_id, now + lease_seconds, row["id"]),
+            )
+        return {
+            "id": row["id"],
+            "job_id": row["job_id"],
+            "names": json.loads(row["names"]),
+            "attempts": row["attempts"] + 1,
+            "threshold": row["threshold"],
+            "mode": row["mode"],
+        }
+
+    def heartbeat(self, node_id, lease_seconds=LEASE_SECONDS):
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO nodes (node_id, pid, heartbeat_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(node_id) DO UPDATE SET pid = excluded.pid, heartbeat_at = excluded.heartbeat_at",
+                (node_id, os.getpid(), now),
+            )
+            conn.execute(
+                "UPDATE chunks SET lease_expires = ? WHERE state = 'leased' AND lease_owner = ?",
+                (now + lease_seconds, node_id),
+            )
+
+    def completed_names(self, job_id):
+        return {r[0] for r in self.conn.execute("SELECT name FROM completed WHERE job_id = ?", (job_id,))}
+
+    def complete_name(self, chunk_id, node_id, job_id, name, rows):
+        """Atomically stores a name's result rows and marks it done, provided the
+        node still holds the chunk's lease."""
+        with self._transaction() as conn:
+            owner = conn.execute(
+                "SELECT 1 FROM chunks WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+                (chunk_id, node_id),
+            ).fetchone()
+            if owner is None:
+                raise LeaseLost(f"Chunk {chunk_id} is no longer leased by {node_id}")
+            conn.executemany(
+                "INSERT OR IGNORE INTO results (job_id, search_term, seq, row) VALUES (?, ?, ?, ?)",
+                [(job_id, name, seq, json.dumps(r)) for seq, r in enumerate(rows)],
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO completed (job_id, name, node_id, completed_at) VALUES (?, ?, ?, ?)",
+                (job_id, name, node_id, time.time()),
+            )
+
+    def finish_chunk(self, chunk_id, node_id):
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE chunks SET state = 'done', lease_owner = NULL WHERE id = ? AND lease_owner = ?",
+                (chunk_id, node_id),
+            )
+
+    def release_dead_nodes(self, node_ttl=NODE_TTL):
+        """Expires the leases of nodes that stopped heartbeating. Returns their ids."""
+        cutoff = time.time() - node_ttl
+        with self._transaction() as conn:
+            dead = [r[0] for r in conn.execute("SELECT node_id FROM nodes WHERE heartbeat_at < ?", (cutoff,))]
+            for node_id in dead:
+                conn.execute(
+                    "UPDATE chunks SET lease_expires = 0 WHERE state = 'leased' AND lease_owner = ?",
+                    (node_id,),
+                )
+                conn.execute("DELETE FROM nodes WHERE node_id = ?", (node_id,))
+        return dead
+
+    def job_progress(self, job_id):
+        job = self.conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if job is None:
+            return None
+        done = self.conn.execute("SELECT COUNT(*) FROM completed WHERE job_id = ?", (job_id,)).fetchone()[0]
+        open_chunks = self.conn.execute(
+            "SELECT COUNT(*) FROM chunks WHERE job_id = ? AND state != 'done'", (job_id,)
+        ).fetchone()[0]
+        return {
+            "job_id": job_id,
+            "filename": job["filename"],
+            "created_at": job["created_at"],
+            "total": job["total"],
+            "completed": done,
+            "finished": open_chunks == 0,
+            "merged": bool(job["merged"]),
+        }
+
+    def unmerged_jobs(self):
+        return [r[0] for r in self.conn.execute("SELECT job_id FROM jobs WHERE merged = 0 ORDER BY created_at")]
+
+    def results(self, job_id):
+        return [json.loads(r[0]) for r in self.conn.execute(
+            "SELECT row FROM results WHERE job_id = ? ORDER BY id", (job_id,)
+        )]
+
+    def mark_merged(self, job_id):
+        with self._transaction() as conn:
+            conn.execute("UPDATE jobs SET merged = 1 WHERE job_id = ?", (job_id,))
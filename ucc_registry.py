@@ -0,0 +1,235 @@
+import json
+import os
+import signal
+import threading
+import time
+
+HEARTBEAT_DIR = "public/Uploads/.heartbeats"
+HEARTBEAT_INTERVAL = 2  # seconds between heartbeats written by watcher/worker
+HEARTBEAT_TTL = 10      # a process missing heartbeats for this long is considered gone
+REFRESH_INTERVAL = 1    # how often the bridge re-reads the heartbeat directory
+MAX_TRACKED_JOBS = 200
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class Heartbeat:
+    """Publishes a small JSON heartbeat for the current process so the bridge can
+    track it without shelling out to pgrep."""
+
+    def __init__(self, role, job_id="", state="starting"):
+        self.role = role
+        self.pid = os.getpid()
+        self.info = {
+            "pid": self.pid,
+            "role": role,
+            "job_id": job_id,
+            "state": state,
+            "started_at": time.time(),
+            "heartbeat_at": 0,
+        }
+        self.path = os.path.join(HEARTBEAT_DIR, f"{role}_{self.pid}.json")
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.beat()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(HEARTBEAT_INTERVAL):
+            self.beat()
+
+    def update(self, **fields):
+        with self._lock:
+            changed = any(self.info.get(k) != v for k, v in fields.items())
+            self.info.update(fields)
+        if changed: self.beat()
+
+    def beat(self):
+        with self._lock:
+            self.info["heartbeat_at"] = time.time()
+            payload = dict(self.info)
+        try:
+            os.makedirs(HEARTBEAT_DIR, exist_ok=True)
+            temp_file = f"{self.path}.tmp"
+            with open(temp_file, 'w') as f:
+                json.dump(payload, f)
+            os.replace(temp_file, self.path)
+        except OSError as e:
+            print(f"Heartbeat write failed: {e}")
+
+    def stop(self):
+        self._stop.set()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class ProcessRegistry:
+    """In-memory view of watcher/worker processes and scrape jobs.
+
+    A background thread folds heartbeat files into memory, so status and control
+    endpoints only read a dict.
+    """
+
+    def __init__(self, heartbeat_dir=HEARTBEAT_DIR):
+        self.heartbeat_dir = heartbeat_dir
+        self._lock = threading.Lock()
+        self._processes = {}  # pid -> heartbeat info
+        self._children = {}   # pid -> Popen for processes launched by this registry
+        self._jobs = {}       # job_id -> {"state", "queued_at", "updated_at", "pid"}
+        self._stopping = set()  # signalled pids, left out of the view until they exit
+        self._thread = None
+
+    def start(self):
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            time.sleep(REFRESH_INTERVAL)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Registry refresh failed: {e}")
+
+    def refresh(self):
+        now = time.time()
+        seen = {}
+        if os.path.isdir(self.heartbeat_dir):
+            for entry in os.scandir(self.heartbeat_dir):
+                if not entry.name.endswith('.json'):
+                    continue
+                try:
+                    with open(entry.path, 'r') as f:
+                        info = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                pid = info.get("pid")
+                if not pid:
+                    continue
+                if now - info.get("heartbeat_at", 0) > HEARTBEAT_TTL or not pid_alive(pid):
+                    # Process died without cleaning up after itself
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+                    continue
+                seen[pid] = info
+
+        with self._lock:
+            for pid, popen in list(self._children.items()):
+                if popen.poll() is not None:
+                    del self._children[pid]
+                elif pid not in seen and pid in self._processes:
+                    # Launched by us but has not written its first heartbeat yet
+                    seen[pid] = self._processes[pid]
+            # Reaped above if it was our child; otherwise gone once the pid is
+            self._stopping = {pid for pid in self._stopping if pid in self._children or pid_alive(pid)}
+            for pid in self._stopping:
+                seen.pop(pid, None)
+            self._processes = seen
+            for info in seen.values():
+                job_id = info.get("job_id")
+                if job_id:
+                    job = self._jobs.setdefault(job_id, {"queued_at": info.get("started_at")})
+                    job.update({"state": info.get("state", ""), "pid": info["pid"], "updated_at": info["heartbeat_at"]})
+            running = {info.get("job_id") for info in seen.values()}
+            for job_id, job in self._jobs.items():
+                # A job whose worker vanished mid-flight is no longer running
+                if job.get("pid") and job_id not in running and job.get("state") not in ("Completed", "Stopped", "Exited"):
+                    job["state"] = "Exited"
+            self._trim_jobs()
+
+    def _trim_jobs(self):
+        """Drops the least recently updated jobs past MAX_TRACKED_JOBS. Called
+        with the lock held, wherever jobs are added."""
+        if len(self._jobs) > MAX_TRACKED_JOBS:
+            oldest = sorted(self._jobs, key=lambda j: self._jobs[j].get("updated_at", 0))
+            for stale_id in oldest[:len(self._jobs) - MAX_TRACKED_JOBS]:
+                del self._jobs[stale_id]
+
+    def record_job(self, job_id, state="Queued"):
+        now = time.time()
+        with self._lock:
+            job = self._jobs.setdefault(job_id, {"queued_at": now})
+            job.update({"state": state, "updated_at": now})
+            self._trim_jobs()
+
+    def register_child(self, popen, role):
+        now = time.time()
+        with self._lock:
+            self._children[popen.pid] = popen
+            self._processes.setdefault(popen.pid, {
+                "pid": popen.pid, "role": role, "state": "starting",
+                "started_at": now, "heartbeat_at": now,
+            })
+
+    def processes(self, role=None):
+        with self._lock:
+            return [dict(p) for p in self._processes.values() if role is None or p.get("role") == role]
+
+    def is_alive(self, role):
+        with self._lock:
+            return any(p.get("role") == role for p in self._processes.values())
+
+    def is_busy(self, role):
+        """True if a process with the role is working on a job. Distributed
+        queue nodes stay alive between chunks with an empty job_id."""
+        with self._lock:
+            return any(p.get("role") == role and p.get("job_id") for p in self._processes.values())
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "processes": [dict(p) for p in self._processes.values()],
+                "jobs": {job_id: dict(job) for job_id, job in self._jobs.items()},
+            }
+
+    def terminate(self, role):
+        """Sends SIGTERM to every known process with the given role and returns
+        the signalled PIDs without waiting: they leave the view now, and
+        refresh reaps them once they exit."""
+        now = time.time()
+        with self._lock:
+            pids = [pid for pid, p in self._processes.items() if p.get("role") == role]
+            for pid in pids:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except OSError:
+                    pass
+                self._stopping.add(pid)
+                info = self._processes.pop(pid)
+                job = self._jobs.get(info.get("job_id"))
+                if job is not None:
+                    job.update({"state": "Stopped", "updated_at": now})
+        return pids
+
+    def wait_exited(self, pids, timeout):
+        """Blocks until the processes are gone or `timeout` passes. For
+        background threads; request handlers should not wait on it."""
+        deadline = time.time() + timeout
+        while True:
+            with self._lock:
+                if not self._stopping.intersection(pids):
+                    return True
+            if time.time() >= deadline:
+                return False
+            time.sleep(REFRESH_INTERVAL / 4)
@@ -0,0 +1,247 @@
+import csv
+import html
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from hub_layout import classify_csv
+import hub_snapshots
+import ucc_http
+
+SUNBIZ_BASE = os.environ.get("SUNBIZ_BASE", "https://search.sunbiz.org")
+DATA_ROOT = "Data"
+OUTPUT_FILE = "Data/SunBiz Results/sunbiz_enrichment.csv"
+ENRICH_TTL_DAYS = 30   # a document number enriched more recently than this is not fetched again
+BATCH_SIZE = ucc_http.POOL_SIZE * 4
+
+# "Document Number" is the hub's, which keys the TTL; "Sunbiz Document Number"
+# is what the detail page reports, which can differ (e.g. after a conversion)
+FIELDNAMES = (
+    "Document Number", "Sunbiz Document Number", "Business Name", "Entity Type", "Sunbiz Status", "FEI/EIN Number",
+    "Date Filed", "Last Event", "Principal Address", "Mailing Address", "Registered Agent",
+    "Officers", "Last Annual Report", "Sunbiz Link", "Missing Fields", "Enriched At",
+)
+ENRICHED_AT = FIELDNAMES.index("Enriched At")
+
+# What SunBiz shows when an entity has no FEIN on file yet
+FEIN_PLACEHOLDERS = {"", "NONE", "N/A", "APPLIED FOR"}
+
+# The detail page is server-rendered with a fixed layout, so a handful of
+# regexes over the raw HTML pull out every field without building a DOM
+SECTION_REGEX = re.compile(r'<div class="detailSection([^"]*)">(.*?)(?=<div class="detailSection|\Z)', re.S)
+HEADING_REGEX = re.compile(r'<span>(.*?)</span>', re.S)
+LABEL_REGEX = re.compile(r'<label for="Detail_(\w+)">.*?</label>\s*<span>(.*?)</span>', re.S)
+PARAGRAPH_REGEX = re.compile(r'<p>(.*?)</p>', re.S)
+BLOCK_REGEX = re.compile(r'<div>(.*?)</div>', re.S)
+OFFICER_REGEX = re.compile(r'<span>Title\s*(.*?)</span>', re.S)
+REPORT_REGEX = re.compile(r'<tr>\s*<td>\s*(\d{4})\s*</td>\s*<td>\s*(.*?)\s*</td>', re.S)
+BR_REGEX = re.compile(r'<br\s*/?>', re.I)
+TAG_REGEX = re.compile(r'<[^>]+>')
+
+# Corporations list officers/directors, LLCs their authorized persons
+OFFICER_HEADINGS = ("Officer/Director", "Authorized Person")
+
+LABEL_FIELDS = {
+    "DocumentId": "document_number",
+    "FeiEinNumber": "fein",
+    "FileDate": "date_filed",
+    "EntityStateCountry": "state",
+    "Status": "status",
+    "LastEvent": "last_event",
+}
+
+
+def clean_text(fragment, sep=' '):
+    """Tag-free text of an HTML fragment, one entry per <br/> line joined by `sep`."""
+    text = html.unescape(TAG_REGEX.sub('', BR_REGEX.sub('\n', fragment)))
+    return sep.join(' '.join(line.split()) for line in text.split('\n') if line.strip())
+
+
+def parse_detail(page):
+    """Fields of a search.sunbiz.org SearchResultDetail page. `found` is
+    False when the page holds no filing (e.g. the entity was purged)."""
+    info = {"found": False, "officers": [], "annual_reports": []}
+    for classes, body in SECTION_REGEX.findall(page):
+        if "corporationName" in classes:
+            paragraphs = [clean_text(p) for p in PARAGRAPH_REGEX.findall(body)]
+            if paragraphs: info["entity_type"] = paragraphs[0]
+            if len(paragraphs) > 1: info["name"] = paragraphs[-1]
+            continue
+        if "filingInformation" in classes:
+            info["found"] = True
+            for label, value in LABEL_REGEX.findall(body):
+                if label in LABEL_FIELDS:
+                    info[LABEL_FIELDS[label]] = clean_text(value)
+            continue
+
+        heading = HEADING_REGEX.search(body)
+        title = clean_text(heading.group(1)) if heading else ""
+        rest = body[heading.end():] if heading else body
+        block = BLOCK_REGEX.search(rest)
+        if title == "Principal Address" and block:
+            info["principal_address"] = clean_text(block.group(1), '\n')
+        elif title == "Mailing Address" and block:
+            info["mailing_address"] = clean_text(block.group(1), '\n')
+        elif title.startswith("Registered Agent"):
+            agent = HEADING_REGEX.search(rest)
+            info["registered_agent"] = clean_text(agent.group(1)) if agent else ""
+            if block: info["registered_agent_address"] = clean_text(block.group(1), '\n')
+        elif title.startswith(OFFICER_HEADINGS):
+            # Each officer is "<span>Title X</span> NAME <div>address</div>" up to the next title
+            parts = OFFICER_REGEX.split(rest)
+            for officer_title, chunk in zip(parts[1::2], parts[2::2]):
+                name = clean_text(chunk, '\n').split('\n')[0]
+                info["officers"].append([clean_text(officer_title), name])
+        elif title.startswith("Annual Reports"):
+            info["annual_reports"] = [list(r) for r in REPORT_REGEX.findall(rest)]
+    return info
+
+
+def detail_url(link):
+    """Points a hub's Sunbiz Link at SUNBIZ_BASE, so a local fixture server
+    can stand in for search.sunbiz.org."""
+    base = urlsplit(SUNBIZ_BASE)
+    return urlsplit(link)._replace(scheme=base.scheme, netloc=base.netloc).geturl()
+
+
+def fetch_detail(link, on_error=None):
+    """Parsed detail page, or None if it could not be fetched (not cached,
+    so the document is tried again on the next run)."""
+    resp = ucc_http.get(detail_url(link), retries=3, what="SunBiz detail", on_error=on_error)
+    return parse_detail(resp.text) if resp else None
+
+
+def missing_fields(row):
+    missing = []
+    if (row.get("FEI/EIN Number") or "").strip().upper() in FEIN_PLACEHOLDERS:
+        missing.append("FEI/EIN Number")
+    if not (row.get("Officer") or "").strip():
+        missing.append("Officers")
+    if not (row.get("Sunbiz Status") or "").strip():
+        missing.append("Sunbiz Status")
+    return missing
+
+
+def load_enriched(output_file=OUTPUT_FILE):
+    """{document number: epoch seconds of its latest enrichment}."""
+    enriched = {}
+    if not os.path.exists(output_file):
+        return enriched
+    with open(output_file, 'r', encoding='utf-8', errors='ignore', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if len(row) != len(FIELDNAMES):
+                continue
+            try:
+                at = datetime.fromisoformat(row[ENRICHED_AT]).timestamp()
+            except ValueError:
+                continue
+            enriched[row[0]] = max(at, enriched.get(row[0], 0))
+    return enriched
+
+
+def load_candidates(paths=None, ttl_days=ENRICH_TTL_DAYS, output_file=OUTPUT_FILE, data_type=None):
+    """SB hub rows with a document number and a detail link that are missing
+    a FEIN, officers or status, one per document number, skipping documents
+    enriched within the TTL. `paths` limits the scan to those hub files, which
+    must be SB hubs. A file's type comes from its directory under Data/; files
+    elsewhere need an explicit `data_type`. Raises ValueError otherwise."""
+    explicit = paths is not None
+    if paths is None:
+        paths = []
+        for root, _, files in os.walk(DATA_ROOT):
+            paths.extend(os.path.join(root, f) for f in files if f.endswith('.csv'))
+
+    config = hub_snapshots.load_mappings()
+    index = hub_snapshots.load_index()
+    fresh_after = time.time() - ttl_days * 86400
+    enriched = load_enriched(output_file)
+    candidates = {}
+
+    for path in paths:
+        rel_dir = os.path.relpath(os.path.dirname(path), DATA_ROOT)
+        outside = rel_dir == os.pardir or rel_dir.startswith(os.pardir + os.sep)
+        if outside and not data_type:
+            raise ValueError(f"{path} is outside {DATA_ROOT}/, so its hub type is unknown; pass it explicitly (e.g. --data_type SB)")
+        file_type, zip_code, location = classify_csv('.' if outside else rel_dir, os.path.basename(path))
+        file_type = data_type or file_type
+        if "SB" not in file_type:
+            if explicit:
+                raise ValueError(f"{path} is a {file_type} hub, not an SB hub")
+            continue
+        try:
+            if outside:
+                # Snapshots mirror Data/, so a file elsewhere is parsed without caching
+                snapshot = hub_snapshots.build_snapshot(path, file_type, zip_code, location, config)
+            else:
+                snapshot_path = os.path.join('public', hub_snapshots.ensure_snapshot(
+                    path, file_type, zip_code, location, config, index
+                ))
+                with open(snapshot_path, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Skipping {path} for enrichment: {e}")
+            continue
+
+        columns = snapshot["columns"]
+        for values in snapshot["rows"]:
+            row = dict(zip(columns, values))
+            doc = (row.get("Document Number") or "").strip()
+            link = row.get("Sunbiz Link") or ""
+            if not doc or doc in candidates or "SearchResultDetail" not in link:
+                continue
+            if enriched.get(doc, 0) >= fresh_after:
+                continue
+            missing = missing_fields(row)
+            if missing:
+                candidates[doc] = {"doc": doc, "name": row.get("businessName") or "", "link": link, "missing": missing}
+
+    hub_snapshots.save_index(index)
+    return list(candidates.values())
+
+
+def enrichment_record(candidate, info, enriched_at):
+    """Output row for one document, in FIELDNAMES order."""
+    if not info.get("found"):
+        return (candidate["doc"], "", candidate["name"], "", "Not found", *("",) * 8,
+                candidate["link"], ", ".join(candidate["missing"]), enriched_at)
+    agent = "\n".join(filter(None, (info.get("registered_agent"), info.get("registered_agent_address"))))
+    officers = "; ".join(f"{title}: {name}" for title, name in info["officers"])
+    latest = max(info["annual_reports"], default=None)
+    return (
+        candidate["doc"], info.get("document_number", ""), info.get("name") or candidate["name"],
+        info.get("entity_type", ""), info.get("status", ""), info.get("fein", ""),
+        info.get("date_filed", ""), info.get("last_event", ""),
+        info.get("principal_address", ""), info.get("mailing_address", ""), agent,
+        officers, f"{latest[0]} ({latest[1]})" if latest else "",
+        candidate["link"], ", ".join(candidate["missing"]), enriched_at,
+    )
+
+
+def enrich_batch(batch, journal=None, on_error=None):
+    """Fetches a batch of detail pages concurrently over the shared pool (the
+    per-host limiter still paces them) and yields (candidate, record) in batch
+    order. Pages the journal already holds are not fetched; record is None
+    for pages that could not be fetched."""
+    with ThreadPoolExecutor(max_workers=ucc_http.POOL_SIZE) as pool:
+        futures = {}
+        for c in batch:
+            if not (journal and (c["doc"], "detail") in journal.responses):
+                futures[c["doc"]] = pool.submit(fetch_detail, c["link"], on_error)
+
+        for c in batch:
+            future = futures.get(c["doc"])
+            fetch = future.result if future else (lambda: None)
+            if journal:
+                info, _ = journal.response(c["doc"], "detail", fetch)
+            else:
+                info = fetch()
+            if info is None:
+                yield c, None
+            else:
+                yield c, enrichment_record(c, info, time.strftime('%Y-%m-%dT%H:%M:%S'))
@@ -5,6 +5,15 @@ import json
 import csv
 import threading
 import queue
+import signal
+import argparse
+from datetime import datetime
+from ucc_registry import Heartbeat
+from ucc_queue import WorkQueue, QUEUE_FILE
+from ucc_journal import ScrapeJournal
+from ucc_worker import read_input_csv, write_results_to_output, OUTPUT_FILE
+from ucc_compact import compact_results, MIN_TAIL_BYTES
+from ucc_priority import rank_names
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
@@ -14,6 +23,8 @@ COMMANDS_DIRECTORY = os.path.join(WATCH_DIRECTORY, "Commands")
 PROCESSED_DIRECTORY = os.path.join(WATCH_DIRECTORY, "Processed")
 PENDING_JOBS_FILE = os.path.join(WATCH_DIRECTORY, "pending_jobs.json")
 STATUS_DIRECTORY = os.path.join(WATCH_DIRECTORY, "status") # Simplified path
+COORDINATOR_INTERVAL = 10 # seconds between queue sweeps in distributed mode
+COMPACT_HOURS = 6         # default interval between all_results.csv compactions
 
 # Ensure directories exist
 for d in [STAGING_DIRECTORY, COMMANDS_DIRECTORY, PROCESSED_DIRECTORY, STATUS_DIRECTORY]:
@@ -90,7 +101,94 @@ class CommandHandler(FileSystemEventHandler):
             except Exception as e:
                 print(f"Error processing command {event.src_path}: {e}")
 
-def worker_thread(processing_queue):
+def move_to_processed(filename):
+    staging_path = os.path.join(STAGING_DIRECTORY, filename)
+    dest_path = os.path.join(PROCESSED_DIRECTORY, filename)
+    if os.path.exists(dest_path):
+        base, ext = os.path.splitext(filename)
+        dest_path = os.path.join(PROCESSED_DIRECTORY, f"{base}_{int(time.time())}{ext}")
+
+    os.rename(staging_path, dest_path)
+    update_pending_jobs()
+
+def write_job_status(job_id, status):
+    temp_file = os.path.join(STATUS_DIRECTORY, f"{os.path.basename(job_id)}.json.tmp")
+    with open(temp_file, 'w') as f:
+        json.dump(status, f)
+    os.replace(temp_file, temp_file[:-len(".tmp")])
+
+def enqueue_distributed(work_queue, cmd):
+    filename = cmd.get("filename")
+    job_id = cmd.get("job_id", filename)
+    names = read_input_csv(os.path.join(STAGING_DIRECTORY, filename), cmd.get("column"))
+    # Chunks are leased in insertion order, so the most valuable names go out first
+    try:
+        names, _ = rank_names(names)
+    except Exception as e:
+        print(f"Prioritization failed, using file order: {e}")
+    work_queue.enqueue_job(job_id, names, filename, float(cmd.get("threshold") or 0.7), cmd.get("mode") or "standard")
+    write_job_status(job_id, {
+        "filename": filename, "progress": 0, "total": len(names), "current_name": "",
+        "status": "Queued", "errors": [], "start_time": datetime.now().isoformat(), "results": []
+    })
+    move_to_processed(filename)
+    print(f"Queued {len(names)} names from {filename} for distributed workers.")
+
+def coordinator_thread(queue_path):
+    """Distributed mode: releases leases held by dead nodes, publishes job
+    progress and merges finished jobs into all_results.csv exactly once.
+
+    Each merge goes through a journal keyed by job id, so a crash between the
+    append and mark_merged is settled against the output file on restart
+    instead of appending the job's rows a second time."""
+    work_queue = WorkQueue(queue_path)
+    journal = ScrapeJournal(os.path.join(os.path.dirname(queue_path) or '.', "merge_journal.jsonl"))
+    while True:
+        try:
+            # Intents left by a crash or a failed append on an earlier pass
+            journal.recover(OUTPUT_FILE)
+            dead = work_queue.release_dead_nodes()
+            if dead: print(f"Released leases of dead nodes: {', '.join(dead)}")
+
+            for job_id in work_queue.unmerged_jobs():
+                progress = work_queue.job_progress(job_id)
+                total = progress["total"] or 1
+                status = {
+                    "filename": progress["filename"], "progress": progress["completed"] / total * 100,
+                    "total": progress["total"], "current_name": "", "status": "Scraping",
+                    "errors": [], "start_time": datetime.fromtimestamp(progress["created_at"]).isoformat(), "results": []
+                }
+                if progress["finished"]:
+                    rows = work_queue.results(job_id)
+                    if job_id not in journal.completed:
+                        write_results_to_output(rows, journal, job_id)
+                    work_queue.mark_merged(job_id)
+                    status.update({"status": "Completed", "progress": 100, "results": rows[-20:]})
+                    print(f"Merged {len(rows)} rows from distributed job {job_id}.")
+                    subprocess.run(["python3", "generate_manifest.py"])
+                write_job_status(job_id, status)
+        except Exception as e:
+            print(f"Coordinator error: {e}")
+        time.sleep(COORDINATOR_INTERVAL)
+
+def compaction_thread(interval_hours):
+    """Periodically compacts all_results.csv to the latest row per filing.
+    Workers keep appending while it runs."""
+    while True:
+        time.sleep(interval_hours * 3600)
+        try:
+            stats = compact_results(OUTPUT_FILE, MIN_TAIL_BYTES)
+            if stats is None: continue
+            print(f"Compacted {OUTPUT_FILE} to generation {stats['generation']}: "
+                  f"{stats['bytes_reclaimed']} bytes reclaimed ({stats['bytes_before']} -> {stats['bytes_after']}), "
+                  f"{stats['rows_kept']} rows, {stats['negative_lookups']} no-result names in {stats['seconds']}s")
+            if stats["bytes_reclaimed"] > 0:
+                subprocess.run(["python3", "generate_manifest.py"])
+        except Exception as e:
+            print(f"Compaction error: {e}")
+
+def worker_thread(processing_queue, heartbeat=None, queue_path=None):
+    work_queue = WorkQueue(queue_path) if queue_path else None
     while True:
         cmd = processing_queue.get()
         if cmd is None: break
@@ -103,7 +201,16 @@ def worker_thread(processing_queue):
             processing_queue.task_done()
             continue
 
+        if work_queue is not None:
+            try:
+                enqueue_distributed(work_queue, cmd)
+            except Exception as e:
+                print(f"Error queueing {filename}: {e}")
+            processing_queue.task_done()
+            continue
+
         print(f"Starting worker for {filename}...")
+        if heartbeat: heartbeat.update(state="processing", job_id=cmd.get("job_id", filename))
         try:
             # Build command
             args = ["python3", "ucc_worker.py", staging_path]
@@ -120,30 +227,46 @@ def worker_thread(processing_queue):
 
             subprocess.run(args, check=True)
 
-            # Move to processed
-            dest_path = os.path.join(PROCESSED_DIRECTORY, filename)
-            if os.path.exists(dest_path):
-                base, ext = os.path.splitext(filename)
-                dest_path = os.path.join(PROCESSED_DIRECTORY, f"{base}_{int(time.time())}{ext}")
-
-            os.rename(staging_path, dest_path)
-            update_pending_jobs()
+            move_to_processed(filename)
             print(f"Finished processing {filename}.")
         except subprocess.CalledProcessError as e:
             print(f"Error processing {filename}: {e}")
         except Exception as e:
             print(f"Unexpected error processing {filename}: {e}")
 
+        if heartbeat: heartbeat.update(state="idle", job_id="")
         processing_queue.task_done()
 
+def handle_sigterm(signum, frame):
+    raise KeyboardInterrupt
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UCC Upload Watcher")
+    parser.add_argument("--distributed", action="store_true", help="Queue jobs for ucc_worker.py --queue nodes instead of running them locally")
+    parser.add_argument("--queue", default=QUEUE_FILE, help="Work queue database shared with the nodes")
+    parser.add_argument("--compact_hours", type=float, default=COMPACT_HOURS, help="Hours between all_results.csv compactions (0 disables)")
+    args = parser.parse_args()
+
     # Initial sync of staging
     update_pending_jobs()
 
     processing_queue = queue.Queue()
 
+    # Let the bridge see this process without pgrep
+    heartbeat = Heartbeat("watcher", state="idle").start()
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+    queue_path = None
+    if args.distributed:
+        queue_path = args.queue
+        threading.Thread(target=coordinator_thread, args=(queue_path,), daemon=True).start()
+        print(f"Distributed mode: queueing jobs in {queue_path}")
+
+    if args.compact_hours > 0:
+        threading.Thread(target=compaction_thread, args=(args.compact_hours,), daemon=True).start()
+
     # Start worker thread
-    t = threading.Thread(target=worker_thread, args=(processing_queue,))
+    t = threading.Thread(target=worker_thread, args=(processing_queue, heartbeat, queue_path))
     t.daemon = True
     t.start()
 
@@ -164,4 +287,6 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         observer.stop()
         processing_queue.put(None)
+    finally:
+        heartbeat.stop()
     observer.join()
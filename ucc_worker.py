@@ -1,17 +1,28 @@
 import csv
-import requests
+import io
 import time
 import os
 import sys
 import subprocess
-import random
 import json
 import argparse
+import signal
+import socket
+import threading
+from collections import deque
 from datetime import datetime
 from difflib import SequenceMatcher
+import ucc_http
+from ucc_registry import Heartbeat
+from ucc_aggregates import refresh_aggregates
+from ucc_queue import WorkQueue, LeaseLost
+from ucc_priority import rank_names
+from ucc_journal import ScrapeJournal
+import ucc_sunbiz
+from ucc_records import FIELDNAMES, EMPTY_PARTY, MAX_SECURED_PARTIES, FilingRecord, as_row
 
 # Configuration
-API_BASE = "https://publicsearchapi.floridaucc.com"
+API_BASE = os.environ.get("UCC_API_BASE", "https://publicsearchapi.floridaucc.com")
 SEARCH_PARAMS = {
     "searchOptionType": "LegacySearch",
     "searchOptionSubOption": "FiledAndLapsedActualDebtorNameList",
@@ -26,10 +37,13 @@ MAX_RETRIES = 3
 CHECKPOINT_INTERVAL = 15
 RUN_TIME_MINUTES = 5
 PAUSE_SECONDS = 30
-MAX_SECURED_PARTIES = 5
 OUTPUT_FILE = "Data/UCC Results/all_results.csv"
 CHECKPOINT_DIR = "public/Uploads/.checkpoints"
 STATUS_DIR = "public/Uploads/status"
+LIVE_RESULTS_LIMIT = 20      # rows kept in the status file for the live results table
+QUEUE_POLL_SECONDS = 5       # idle wait between lease attempts in distributed mode
+QUEUE_HEARTBEAT_SECONDS = 15 # how often a node extends its leases
+AGGREGATES_INTERVAL = 30     # min seconds between dashboard aggregate refreshes while a job appends
 
 def similarity_score(a, b):
     a = a.upper().strip()
@@ -58,53 +72,26 @@ def is_close_match(search_term, result_name, threshold=0.7, mode='standard'):
     return score >= threshold, score
 
 def search_debtor(name):
-    url = f"{API_BASE}/Search"
     params = {**SEARCH_PARAMS, "text": name}
-
-    for attempt in range(MAX_RETRIES):
-        try:
-            resp = requests.get(url, params=params, timeout=30)
-            if resp.status_code == 200:
-                data = resp.json()
-                return data.get("payload", {}).get("debtors", [])[:MAX_RESULTS_PER_NAME]
-            else:
-                msg = f"API error {resp.status_code} on search '{name}', retrying ({attempt+1}/{MAX_RETRIES})..."
-                print(f"    {msg}")
-                update_status_error(msg)
-                time.sleep(random.randint(10, 30))
-        except Exception as e:
-            msg = f"Exception during search '{name}': {e}, retrying..."
-            print(f"    {msg}")
-            update_status_error(msg)
-            time.sleep(random.randint(10, 30))
-
-    return []
+    resp = ucc_http.get(f"{API_BASE}/Search", params, MAX_RETRIES, f"search '{name}'", update_status_error, paced=False)
+    try:
+        return resp.json().get("payload", {}).get("debtors", [])[:MAX_RESULTS_PER_NAME] if resp else []
+    except ValueError as e:
+        update_status_error(f"Bad response on search '{name}': {e}")
+        return []
 
 def get_filing_details(row_number, search_text):
-    url = f"{API_BASE}/filing-details"
     params = {
         **SEARCH_PARAMS,
         "rowNumber": row_number,
         "text": search_text
     }
-
-    for attempt in range(MAX_RETRIES):
-        try:
-            resp = requests.get(url, params=params, timeout=30)
-            if resp.status_code == 200:
-                return resp.json().get("payload", {})
-            else:
-                msg = f"API error {resp.status_code} on details fetch, retrying ({attempt+1}/{MAX_RETRIES})..."
-                print(f"    {msg}")
-                update_status_error(msg)
-                time.sleep(random.randint(10, 30))
-        except Exception as e:
-            msg = f"Exception during details fetch: {e}, retrying..."
-            print(f"    {msg}")
-            update_status_error(msg)
-            time.sleep(random.randint(10, 30))
-
-    return {}
+    resp = ucc_http.get(f"{API_BASE}/filing-details", params, MAX_RETRIES, "details fetch", update_status_error, paced=False)
+    try:
+        return resp.json().get("payload", {}) if resp else {}
+    except ValueError as e:
+        update_status_error(f"Bad response on details fetch: {e}")
+        return {}
 
 def format_address(entity):
     parts = []
@@ -160,21 +147,16 @@ def read_input_csv(filepath, target_column=None):
     return names
 
 def get_fieldnames():
-    fieldnames = [
-        "Search Term", "Match Score", "Status", "Date Filed", "Expires",
-        "Filings Completed Through", "UCC Number", "Filing Events",
-        "Secured Parties Count"
-    ]
-    for i in range(1, MAX_SECURED_PARTIES + 1):
-        fieldnames.extend([f"Secured Party {i} Name", f"Secured Party {i} Address"])
-    fieldnames.extend(["Debtor Parties Count", "Debtor Name", "Debtor Address", "Document Type", "Document Pages"])
-    return fieldnames
-
-def write_results_to_output(results):
+    return list(FIELDNAMES)
+
+def write_results_to_output(results, journal=None, name=None, output_file=OUTPUT_FILE, fieldnames=FIELDNAMES, names=None):
+    """Appends FilingRecords (or dict rows, e.g. from the work queue). With a
+    `journal`, the batch is logged as an intent before it is written and
+    committed after, so a crash in between can be settled on resume; `names`
+    lists the names the batch completes when it carries more than `name`'s rows.
+    Other sources pass their own `output_file` and `fieldnames` with tuple rows."""
     if not results: return
-    fieldnames = get_fieldnames()
-    file_exists = os.path.isfile(OUTPUT_FILE)
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
 
     # Portably handle locking if possible, else just write
     try:
@@ -183,18 +165,51 @@ def write_results_to_output(results):
     except ImportError:
         lock_support = False
 
-    with open(OUTPUT_FILE, 'a', newline='', encoding='utf-8') as f:
-        if lock_support: fcntl.flock(f, fcntl.LOCK_EX)
-        try:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            if not file_exists: writer.writeheader()
-            for r in results:
-                writer.writerow(r)
-        finally:
-            if lock_support: fcntl.flock(f, fcntl.LOCK_UN)
+    while True:
+        with open(output_file, 'ab') as f:
+            if lock_support: fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                # Compaction swaps in a new generation while holding this lock;
+                # if we opened the old file, reopen rather than append to it
+                if lock_support and os.fstat(f.fileno()).st_ino != os.stat(output_file).st_ino:
+                    continue
+
+                buf = io.StringIO()
+                writer = csv.writer(buf)
+                if os.fstat(f.fileno()).st_size == 0: writer.writerow(fieldnames)
+                writer.writerows(as_row(r) for r in results)
+                payload = buf.getvalue().encode('utf-8')
+
+                if journal: journal.begin_write(name, f, payload, names)
+                f.write(payload)
+                f.flush()
+                if journal: os.fsync(f.fileno())
+                break
+            finally:
+                if lock_support: fcntl.flock(f, fcntl.LOCK_UN)
+    if journal: journal.commit(name)
+    refresh_output_aggregates(output_file)
+
+_aggregates_refreshed = {}  # output file -> time of its last aggregate refresh
+
+def refresh_output_aggregates(output_file):
+    """Folds appended rows into the dashboard aggregates, at most every
+    AGGREGATES_INTERVAL seconds: a refresh rewrites the whole aggregate state,
+    which costs more than a name's scrape once the hubs are large. Rows
+    appended since are picked up by the next refresh or by generate_manifest
+    at the end of the job."""
+    now = time.time()
+    if now - _aggregates_refreshed.get(output_file, 0) < AGGREGATES_INTERVAL:
+        return
+    _aggregates_refreshed[output_file] = now
+    try:
+        refresh_aggregates([output_file])
+    except Exception as e:
+        print(f"    Aggregate refresh failed: {e}")
 
 # Status Management
 CURRENT_JOB_ID = ""
+HEARTBEAT = None
 JOB_STATUS = {
     "filename": "",
     "progress": 0,
@@ -203,7 +218,8 @@ JOB_STATUS = {
     "status": "Starting",
     "errors": [],
     "start_time": "",
-    "results": [] # Real-time results for frontend
+    "matches": 0, # Rows with a filing found so far
+    "results": deque(maxlen=LIVE_RESULTS_LIMIT) # Real-time results for frontend
 }
 
 def update_status_file():
@@ -213,44 +229,271 @@ def update_status_file():
     safe_job_id = os.path.basename(CURRENT_JOB_ID)
     status_path = os.path.join(STATUS_DIR, f"{safe_job_id}.json")
     with open(status_path, 'w') as f:
-        json.dump(JOB_STATUS, f)
+        json.dump(dict(JOB_STATUS, results=[r.as_dict() for r in JOB_STATUS["results"]]), f)
+    if HEARTBEAT: HEARTBEAT.update(state=JOB_STATUS["status"])
 
 def update_status_error(error_msg):
     JOB_STATUS["errors"].append(f"[{datetime.now().strftime('%H:%M:%S')}] {error_msg}")
     if len(JOB_STATUS["errors"]) > 20: JOB_STATUS["errors"].pop(0)
     update_status_file()
 
-def save_checkpoint(filename, processed_count):
-    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
-    safe_filename = os.path.basename(filename)
-    cp_path = os.path.join(CHECKPOINT_DIR, f"{safe_filename}.json")
-    with open(cp_path, 'w') as f:
-        json.dump({"processed_count": processed_count}, f)
-
-def load_checkpoint(filename):
+def checkpoint_path(filename, ext="journal"):
     safe_filename = os.path.basename(filename)
-    cp_path = os.path.join(CHECKPOINT_DIR, f"{safe_filename}.json")
-    if os.path.exists(cp_path):
-        with open(cp_path, 'r') as f:
-            return json.load(f).get("processed_count", 0)
-    return 0
+    return os.path.join(CHECKPOINT_DIR, f"{safe_filename}.{ext}")
+
+def load_legacy_checkpoint(filename, all_names):
+    """Names finished according to a checkpoint written before the journal:
+    a `.json` count of names done in file order."""
+    count_path = checkpoint_path(filename, "json")
+    if not os.path.exists(count_path):
+        return set()
+    with open(count_path, 'r') as f:
+        return set(all_names[:json.load(f).get("processed_count", 0)])
+
+def clear_checkpoint(filename):
+    for ext in ("journal", "json"):
+        cp_path = checkpoint_path(filename, ext)
+        if os.path.exists(cp_path): os.remove(cp_path)
+
+def handle_sigterm(signum, frame):
+    JOB_STATUS["status"] = "Stopped"
+    update_status_file()
+    sys.exit(1)
 
-def main():
+def configure_mode(mode, delay=None):
     global REQUEST_DELAY, MAX_RESULTS_PER_NAME, MAX_RETRIES
+    if mode == "lite":
+        REQUEST_DELAY = 1.0
+        MAX_RESULTS_PER_NAME = 3
+        MAX_RETRIES = 2
+    else:
+        REQUEST_DELAY = 2.0
+        MAX_RESULTS_PER_NAME = 10
+        MAX_RETRIES = 3
+    if delay is not None:
+        REQUEST_DELAY = delay
+    # The UCC API is paced by scrape_name sleeping after each live response;
+    # the limiter paces the concurrent sources (SunBiz) at the same interval
+    ucc_http.set_interval(REQUEST_DELAY)
+
+def scrape_name(name, threshold, mode, on_result=None, journal=None):
+    """Runs the search and detail calls for one name and returns its output rows.
+    `on_result` is called with each row as soon as it is built. With a
+    `journal`, responses it already holds are reused instead of re-requested."""
+    if journal:
+        debtors, replayed = journal.search(name, search_debtor)
+    else:
+        debtors, replayed = search_debtor(name), False
+    if not replayed: time.sleep(REQUEST_DELAY)
+
+    name_results = []
+    if not debtors:
+        name_results.append(FilingRecord.miss(name, "No results"))
+        if on_result: on_result(name_results[-1])
+    else:
+        matches = []
+        for d in debtors:
+            is_match, score = is_close_match(name, d.get("name", ""), threshold, mode=mode)
+            if is_match: matches.append((d, score))
+        # Strongest matches first so the best filings surface before the weak ones
+        matches.sort(key=lambda m: m[1], reverse=True)
+
+        if not matches:
+            name_results.append(FilingRecord.miss(name, "No close match"))
+            if on_result: on_result(name_results[-1])
+        else:
+            for deb, score in matches:
+                row_number = deb.get("rowNumber")
+                if journal:
+                    details, replayed = journal.filing_details(name, row_number, get_filing_details)
+                else:
+                    details, replayed = get_filing_details(row_number, name), False
+                if not replayed: time.sleep(REQUEST_DELAY)
+
+                secureds = details.get("secureds", [])[:MAX_SECURED_PARTIES]
+                debtors_list = details.get("debtors", [])
+                parties = []
+                for secured in secureds:
+                    parties += (secured.get("name", ""), format_address(secured))
+                parties += EMPTY_PARTY * (MAX_SECURED_PARTIES - len(secureds))
+
+                record = FilingRecord((
+                    name, f"{score:.2f}", details.get("status", ""),
+                    format_date(details.get("fileDate", "")),
+                    format_date(details.get("expirationDate", "")),
+                    format_date(details.get("filingsCompletedThrough", "")),
+                    details.get("uccNumber", ""), details.get("filingEvents", ""),
+                    details.get("securedPartiesTotalCount", ""),
+                    *parties,
+                    details.get("debtorPartiesTotalCount", ""),
+                    debtors_list[0].get("name", "") if debtors_list else "",
+                    format_address(debtors_list[0]) if debtors_list else "",
+                    details.get("documentType", ""), details.get("documentPagesCount", ""),
+                ))
+                name_results.append(record)
+                if on_result: on_result(record)
+
+    return name_results
+
+def run_node(queue_path, node_id, delay=None, exit_when_idle=False):
+    """Distributed mode: pulls name chunks from the shared work queue until
+    stopped. Each node keeps its own request pacing, so throughput scales with
+    the number of nodes (and IPs) pulling from the queue."""
+    wq = WorkQueue(queue_path)
+    wq.heartbeat(node_id)
+    stop_event = threading.Event()
+
+    def keep_leases_alive():
+        # Separate connection: sqlite3 connections can't be shared across threads
+        hb_queue = WorkQueue(queue_path)
+        while not stop_event.wait(QUEUE_HEARTBEAT_SECONDS):
+            try:
+                hb_queue.heartbeat(node_id)
+            except Exception as e:
+                print(f"Queue heartbeat failed: {e}")
+        hb_queue.close()
+
+    threading.Thread(target=keep_leases_alive, daemon=True).start()
+    print(f"[{datetime.now()}] Node {node_id} pulling from {queue_path}")
+
+    start_time_run = time.time()
+    pause_limit = RUN_TIME_MINUTES * 60
+    try:
+        while True:
+            chunk = wq.lease(node_id)
+            if chunk is None:
+                if exit_when_idle: break
+                time.sleep(QUEUE_POLL_SECONDS)
+                continue
+
+            configure_mode(chunk["mode"], delay)
+            if HEARTBEAT: HEARTBEAT.update(job_id=chunk["job_id"], state="Scraping")
+            done = wq.completed_names(chunk["job_id"])
+            print(f"  Leased chunk {chunk['id']} of {chunk['job_id']} ({len(chunk['names'])} names, attempt {chunk['attempts']})")
+
+            try:
+                for name in chunk["names"]:
+                    if name in done: continue
+                    print(f"  [{node_id}] Searching: {name}")
+                    name_results = scrape_name(name, chunk["threshold"], chunk["mode"])
+                    wq.complete_name(chunk["id"], node_id, chunk["job_id"], name, [r.as_dict() for r in name_results])
+
+                    if time.time() - start_time_run >= pause_limit:
+                        print(f"\nPausing for {PAUSE_SECONDS}s to avoid rate limiting...")
+                        time.sleep(PAUSE_SECONDS)
+                        start_time_run = time.time()
+                wq.finish_chunk(chunk["id"], node_id)
+            except LeaseLost as e:
+                # Another node took the chunk over; whatever we committed is kept
+                print(f"  {e}, moving on")
+            if HEARTBEAT: HEARTBEAT.update(job_id="", state="Idle")
+    finally:
+        stop_event.set()
+        wq.close()
+
+def run_sunbiz(input_file=None, ttl_days=ucc_sunbiz.ENRICH_TTL_DAYS, data_type=None):
+    """SunBiz source: enriches SB hub rows missing a FEIN, officers or status
+    from their detail pages into ucc_sunbiz.OUTPUT_FILE. Shares the session,
+    pacing, journal and status file with the UCC source."""
+    global CURRENT_JOB_ID, HEARTBEAT
+    filename = f"sunbiz_{os.path.basename(input_file) if input_file else 'hubs'}"
+    CURRENT_JOB_ID = CURRENT_JOB_ID or filename
+    HEARTBEAT = Heartbeat("worker", job_id=CURRENT_JOB_ID).start()
+    signal.signal(signal.SIGTERM, handle_sigterm)
 
+    JOB_STATUS["filename"] = filename
+    JOB_STATUS["status"] = "Preparing"
+    JOB_STATUS["start_time"] = datetime.now().isoformat()
+    update_status_file()
+
+    journal = ScrapeJournal(checkpoint_path(filename))
+    redo = journal.recover(ucc_sunbiz.OUTPUT_FILE)
+    if redo: print(f"  Rewriting interrupted batch of {len(redo)} documents")
+    try:
+        candidates = ucc_sunbiz.load_candidates([input_file] if input_file else None, ttl_days, data_type=data_type)
+    except ValueError as e:
+        update_status_error(str(e))
+        JOB_STATUS["status"] = "Stopped"
+        update_status_file()
+        journal.close()
+        sys.exit(f"Error: {e}")
+    # Committed documents are in the output and so already within the TTL,
+    # unless recovery just sent them back for rewriting
+    candidates = [c for c in candidates if c["doc"] not in journal.completed]
+    print(f"[{datetime.now()}] Enriching {len(candidates)} SunBiz documents ({filename})")
+
+    JOB_STATUS["total"] = len(candidates)
+    JOB_STATUS["status"] = "Enriching"
+    update_status_file()
+
+    # ucc_http calls back from the pool's threads
+    status_lock = threading.Lock()
+    def report_error(msg):
+        with status_lock: update_status_error(msg)
+
+    done_count = 0
+    failed = 0
+    for start in range(0, len(candidates), ucc_sunbiz.BATCH_SIZE):
+        batch = candidates[start:start + ucc_sunbiz.BATCH_SIZE]
+        records, docs = [], []
+        for candidate, record in ucc_sunbiz.enrich_batch(batch, journal, report_error):
+            done_count += 1
+            if record is None:
+                failed += 1
+            else:
+                records.append(record)
+                docs.append(candidate["doc"])
+            with status_lock:
+                JOB_STATUS["current_name"] = candidate["name"]
+                JOB_STATUS["progress"] = done_count / len(candidates) * 100
+                update_status_file()
+        # One append and one journal intent per batch; documents that could not
+        # be fetched are left out, so the next run tries them again
+        if records:
+            write_results_to_output(records, journal, docs[0], ucc_sunbiz.OUTPUT_FILE, ucc_sunbiz.FIELDNAMES, docs)
+
+    print(f"Finished enriching {done_count - failed} documents ({failed} could not be fetched).")
+    JOB_STATUS["status"] = "Completed"
+    JOB_STATUS["progress"] = 100
+    update_status_file()
+
+    subprocess.run(["python3", "generate_manifest.py"])
+    journal.close()
+    # Unfetched documents are picked up again by the next run, so the journal can go
+    clear_checkpoint(filename)
+
+def main():
     parser = argparse.ArgumentParser(description="UCC Scraper Worker")
-    parser.add_argument("input_file", nargs="?", help="Path to input CSV")
+    parser.add_argument("input_file", nargs="?", help="Path to input CSV (an SB hub file with --source sunbiz)")
+    parser.add_argument("--source", default="ucc", choices=["ucc", "sunbiz"], help="Scrape Florida UCC filings, or enrich SB hub rows from SunBiz")
+    parser.add_argument("--ttl_days", type=float, default=ucc_sunbiz.ENRICH_TTL_DAYS, help="With --source sunbiz, skip documents enriched within this many days")
+    parser.add_argument("--data_type", help="With --source sunbiz, hub type of an input file outside Data/ (e.g. SB)")
     parser.add_argument("--names", help="Pipe-separated list of business names to search")
     parser.add_argument("--threshold", type=float, default=0.7, help="Similarity threshold (0.0 to 1.0)")
     parser.add_argument("--column", help="Column name or index for business names")
     parser.add_argument("--job_id", help="Job ID for status tracking")
     parser.add_argument("--mode", default="standard", choices=["standard", "lite"], help="Scraping mode")
+    parser.add_argument("--delay", type=float, help="Override the per-request delay in seconds")
+    parser.add_argument("--order", default="value", choices=["value", "file"], help="Scrape most valuable names first, or in file order")
+    parser.add_argument("--queue", help="Run as a distributed node pulling from this work queue database")
+    parser.add_argument("--node_id", help="Node name in distributed mode (defaults to host-pid)")
+    parser.add_argument("--exit_when_idle", action="store_true", help="In distributed mode, exit once the queue is empty")
     args = parser.parse_args()
 
+    global CURRENT_JOB_ID, HEARTBEAT
+    if args.queue:
+        node_id = args.node_id or f"{socket.gethostname()}-{os.getpid()}"
+        HEARTBEAT = Heartbeat("worker", state="Idle").start()
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
+        run_node(args.queue, node_id, args.delay, args.exit_when_idle)
+        return
+
+    configure_mode(args.mode, args.delay)
+    if args.source == "sunbiz":
+        CURRENT_JOB_ID = args.job_id or ""
+        run_sunbiz(args.input_file, args.ttl_days, args.data_type)
+        return
     if args.mode == "lite":
-        REQUEST_DELAY = 1.0
-        MAX_RESULTS_PER_NAME = 3
-        MAX_RETRIES = 2
         print("Running in LITE mode (faster, dynamic thresholds)")
 
     if args.names:
@@ -263,8 +506,9 @@ def main():
         print("Error: Either input_file or --names must be provided.")
         return
 
-    global CURRENT_JOB_ID
     CURRENT_JOB_ID = args.job_id or filename
+    HEARTBEAT = Heartbeat("worker", job_id=CURRENT_JOB_ID).start()
+    signal.signal(signal.SIGTERM, handle_sigterm)
 
     JOB_STATUS["filename"] = filename
     JOB_STATUS["status"] = "Preparing"
@@ -273,94 +517,56 @@ def main():
 
     print(f"[{datetime.now()}] Worker processing {filename} (Threshold: {args.threshold})")
 
-    start_idx = load_checkpoint(filename)
+    journal = ScrapeJournal(checkpoint_path(filename))
+    for name in journal.recover(OUTPUT_FILE):
+        print(f"  Rewriting interrupted batch for {name}")
+    completed = journal.completed | load_legacy_checkpoint(filename, all_names)
+    ordered = list(dict.fromkeys(all_names))
+    if args.order == "value":
+        try:
+            ordered, scores = rank_names(all_names)
+            print(f"Prioritized {len(ordered)} names; top: {', '.join(f'{n} ({scores[n]:.0f})' for n in ordered[:5])}")
+        except Exception as e:
+            print(f"Prioritization failed, using file order: {e}")
+    names_to_process = [n for n in ordered if n not in completed]
+    done_count = len(ordered) - len(names_to_process)
 
-    JOB_STATUS["total"] = len(all_names)
-    JOB_STATUS["progress"] = (start_idx / len(all_names)) * 100 if all_names else 100
+    JOB_STATUS["total"] = len(ordered)
+    JOB_STATUS["progress"] = (done_count / len(ordered)) * 100 if ordered else 100
     JOB_STATUS["status"] = "Scraping"
     update_status_file()
 
-    if start_idx >= len(all_names):
-        print(f"All {len(all_names)} names already processed.")
+    if not names_to_process:
+        print(f"All {len(ordered)} names already processed.")
         JOB_STATUS["status"] = "Completed"
         JOB_STATUS["progress"] = 100
         update_status_file()
+        # A run killed after its last write but before clearing lands here
+        journal.close()
+        clear_checkpoint(filename)
         return
 
-    names_to_process = all_names[start_idx:]
+    def stream_result(row):
+        # The deque only keeps the most recent rows, enough for the frontend
+        # to show "Live" action without the status file growing
+        JOB_STATUS["results"].append(row)
+        if row.get("UCC Number"): JOB_STATUS["matches"] += 1
+        update_status_file()
+
     start_time_run = time.time()
     pause_limit = RUN_TIME_MINUTES * 60
 
-    for idx, name in enumerate(names_to_process):
-        current_idx = start_idx + idx + 1
-        print(f"  [{current_idx}/{len(all_names)}] Searching: {name}")
-
-        JOB_STATUS["progress"] = (current_idx / len(all_names)) * 100
+    for name in names_to_process:
+        print(f"  [{done_count + 1}/{len(ordered)}] Searching: {name}")
         JOB_STATUS["current_name"] = name
         update_status_file()
 
-        debtors = search_debtor(name)
-        time.sleep(REQUEST_DELAY)
-
-        name_results = []
-        if not debtors:
-            name_results.append({
-                "Search Term": name, "Match Score": "0.00", "Status": "No results",
-                "Date Filed": "", "Expires": "", "Filings Completed Through": "", "UCC Number": "", "Filing Events": "", "Secured Parties Count": "",
-                **{f"Secured Party {i} Name": "" for i in range(1, MAX_SECURED_PARTIES + 1)},
-                **{f"Secured Party {i} Address": "" for i in range(1, MAX_SECURED_PARTIES + 1)},
-                "Debtor Parties Count": "", "Debtor Name": "", "Debtor Address": "", "Document Type": "", "Document Pages": ""
-            })
-        else:
-            matches = []
-            for d in debtors:
-                is_match, score = is_close_match(name, d.get("name", ""), args.threshold, mode=args.mode)
-                if is_match: matches.append((d, score))
-
-            if not matches:
-                name_results.append({
-                    "Search Term": name, "Match Score": "0.00", "Status": "No close match",
-                    "Date Filed": "", "Expires": "", "Filings Completed Through": "", "UCC Number": "", "Filing Events": "", "Secured Parties Count": "",
-                    **{f"Secured Party {i} Name": "" for i in range(1, MAX_SECURED_PARTIES + 1)},
-                    **{f"Secured Party {i} Address": "" for i in range(1, MAX_SECURED_PARTIES + 1)},
-                    "Debtor Parties Count": "", "Debtor Name": "", "Debtor Address": "", "Document Type": "", "Document Pages": ""
-                })
-            else:
-                for deb, score in matches:
-                    row_number = deb.get("rowNumber")
-                    details = get_filing_details(row_number, name)
-                    time.sleep(REQUEST_DELAY)
-
-                    secureds = details.get("secureds", [])
-                    debtors_list = details.get("debtors", [])
-
-                    res_dict = {
-                        "Search Term": name, "Match Score": f"{score:.2f}", "Status": details.get("status", ""),
-                        "Date Filed": format_date(details.get("fileDate", "")),
-                        "Expires": format_date(details.get("expirationDate", "")),
-                        "Filings Completed Through": format_date(details.get("filingsCompletedThrough", "")),
-                        "UCC Number": details.get("uccNumber", ""), "Filing Events": details.get("filingEvents", ""),
-                        "Secured Parties Count": details.get("securedPartiesTotalCount", ""),
-                        "Debtor Parties Count": details.get("debtorPartiesTotalCount", ""),
-                        "Debtor Name": debtors_list[0].get("name", "") if debtors_list else "",
-                        "Debtor Address": format_address(debtors_list[0]) if debtors_list else "",
-                        "Document Type": details.get("documentType", ""), "Document Pages": details.get("documentPagesCount", "")
-                    }
-                    for i in range(1, MAX_SECURED_PARTIES + 1):
-                        s_name = secureds[i-1].get("name", "") if (i-1) < len(secureds) else ""
-                        s_addr = format_address(secureds[i-1]) if (i-1) < len(secureds) else ""
-                        res_dict[f"Secured Party {i} Name"] = s_name
-                        res_dict[f"Secured Party {i} Address"] = s_addr
-                    name_results.append(res_dict)
-
-        # Update real-time results in status
-        if name_results:
-            # Only keep the most recent found results in status to avoid huge JSON files
-            # but enough for the frontend to show "Live" action
-            JOB_STATUS["results"] = (JOB_STATUS["results"] + name_results)[-20:]
-
-        write_results_to_output(name_results)
-        save_checkpoint(filename, current_idx)
+        name_results = scrape_name(name, args.threshold, args.mode, on_result=stream_result, journal=journal)
+
+        write_results_to_output(name_results, journal, name)
+        done_count += 1
+        JOB_STATUS["progress"] = (done_count / len(ordered)) * 100
+        update_status_file()
 
         elapsed = time.time() - start_time_run
         if elapsed >= pause_limit:
@@ -376,8 +582,11 @@ def main():
     update_status_file()
 
     subprocess.run(["python3", "generate_manifest.py"])
-    cp_path = os.path.join(CHECKPOINT_DIR, f"{filename}.json")
-    if os.path.exists(cp_path): os.remove(cp_path)
+    journal.close()
+    clear_checkpoint(filename)
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        if HEARTBEAT: HEARTBEAT.stop()
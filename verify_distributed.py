@@ -0,0 +1,119 @@
+import argparse
+import collections
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+from ucc_queue import WorkQueue
+from verify_resume import StubAPI, scratch_copy, seed_of
+
+# Runs several ucc_worker.py nodes against one work queue and a stub UCC API,
+# SIGKILLs one of them while it holds a lease, and checks that its chunk is
+# taken over and the job ends with every name's rows exactly once. Also times
+# the same job on 1, 2, 4... nodes. Runs in a scratch copy so Data/ is untouched.
+
+QUEUE_FILE = "queue.db"
+JOB_ID = "distributed"
+NODE_TTL = 1.0          # seconds of heartbeat silence before the harness releases a node's leases
+HEARTBEAT_SECONDS = 0.2
+
+
+def node_cmd(node_id, delay):
+    # Heartbeat faster than the worker's default so a short NODE_TTL only catches the killed node
+    return [sys.executable, "-c",
+            f"import sys, ucc_worker; sys.argv = sys.argv[1:]; "
+            f"ucc_worker.QUEUE_HEARTBEAT_SECONDS = {HEARTBEAT_SECONDS}; ucc_worker.main()",
+            "ucc_worker.py", "--queue", QUEUE_FILE, "--node_id", node_id, "--exit_when_idle", "--delay", str(delay)]
+
+
+def run_job(work_dir, env, names, nodes, delay, chunk_size, kill=False):
+    """Runs the job to completion on `nodes` nodes, acting as the coordinator
+    (releasing dead nodes' leases). Returns (seconds, killed node, its chunk)."""
+    db = os.path.join(work_dir, QUEUE_FILE)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db + suffix): os.remove(db + suffix)
+    wq = WorkQueue(db)
+    wq.enqueue_job(JOB_ID, names, chunk_size=chunk_size)
+
+    start = time.monotonic()
+    procs = {f"node{i}": subprocess.Popen(node_cmd(f"node{i}", delay), cwd=work_dir, env=env,
+                                          stdout=subprocess.DEVNULL)
+             for i in range(nodes)}
+    killed = killed_chunk = None
+    try:
+        while any(p.poll() is None for p in procs.values()):
+            if kill and killed is None:
+                # Kill node0 once it holds a chunk with at least one name committed from it
+                row = wq.conn.execute(
+                    """SELECT c.id FROM chunks c JOIN completed d ON d.job_id = c.job_id AND d.node_id = c.lease_owner
+                       WHERE c.state = 'leased' AND c.lease_owner = 'node0'
+                       AND c.names LIKE '%' || json_quote(d.name) || '%' LIMIT 1""").fetchone()
+                if row:
+                    procs["node0"].send_signal(signal.SIGKILL)
+                    killed, killed_chunk = "node0", row[0]
+            wq.release_dead_nodes(NODE_TTL)
+            time.sleep(0.05)
+        seconds = time.monotonic() - start
+    finally:
+        for p in procs.values():
+            if p.poll() is None: p.kill()
+            p.wait()
+        wq.close()
+    return seconds, killed, killed_chunk
+
+
+def verify_distributed(names_count, nodes, delay, chunk_size, scaling, keep):
+    work_dir = scratch_copy()
+    names = [f"NODETEST COMPANY {i} LLC" for i in range(names_count)]
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    env = dict(os.environ, UCC_API_BASE=f"http://127.0.0.1:{server.server_port}")
+
+    try:
+        seconds, killed, killed_chunk = run_job(work_dir, env, names, nodes, delay, chunk_size, kill=True)
+        wq = WorkQueue(os.path.join(work_dir, QUEUE_FILE))
+        rows = wq.results(JOB_ID)
+        progress = wq.job_progress(JOB_ID)
+        chunk = wq.conn.execute("SELECT state, attempts FROM chunks WHERE id = ?", (killed_chunk,)).fetchone()
+        finishers = {r[0] for r in wq.conn.execute(
+            "SELECT DISTINCT node_id FROM completed WHERE job_id = ? AND name IN (SELECT value FROM json_each("
+            "(SELECT names FROM chunks WHERE id = ?)))", (JOB_ID, killed_chunk))}
+        wq.close()
+
+        per_name = collections.Counter(r["Search Term"] for r in rows)
+        expected = {n: max(1, seed_of(n) % 4) for n in names}
+        lost = [n for n in names if n not in per_name]
+        duplicated = [n for n, c in per_name.items() if c > expected.get(n, 0)]
+        taken_over = (chunk is not None and chunk["state"] == "done" and chunk["attempts"] > 1
+                      and len(finishers - {killed}) > 0)
+        print(f"nodes={nodes} killed={killed} chunk={killed_chunk} taken_over={taken_over} "
+              f"names={progress['completed']}/{progress['total']} rows={len(rows)} expected={sum(expected.values())} "
+              f"lost={len(lost)} duplicated={len(duplicated)} seconds={seconds:.1f}")
+        ok = (killed is not None and taken_over and progress["finished"] and progress["completed"] == len(names)
+              and len(rows) == sum(expected.values()) and not lost and not duplicated)
+
+        for n in scaling:
+            seconds, _, _ = run_job(work_dir, env, names, n, delay, chunk_size)
+            print(f"scaling nodes={n} seconds={seconds:.1f}")
+    finally:
+        server.shutdown()
+        if not keep: shutil.rmtree(work_dir)
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Node-kill and scaling check for distributed mode")
+    parser.add_argument("--names", type=int, default=120, help="Names in the generated job")
+    parser.add_argument("--nodes", type=int, default=3, help="Nodes in the kill run")
+    parser.add_argument("--delay", type=float, default=0.1, help="Per-request delay of each node")
+    parser.add_argument("--chunk_size", type=int, default=10, help="Names per leased chunk")
+    parser.add_argument("--scaling", default="1,2,4", help="Comma-separated node counts to time without kills ('' to skip)")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory for inspection")
+    args = parser.parse_args()
+    scaling = [int(n) for n in args.scaling.split(",") if n]
+    sys.exit(0 if verify_distributed(args.names, args.nodes, args.delay, args.chunk_size, scaling, args.keep) else 1)
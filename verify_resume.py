@@ -0,0 +1,143 @@
+import argparse
+import collections
+import csv
+import glob
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Kills ucc_worker.py at random points against a stub UCC API and checks that
+# the resumed job ends with every row exactly once, repeats at most the
+# request in flight at each kill, and clears its journal. Runs in a scratch
+# copy so Data/ is untouched.
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_FILE = "Data/UCC Results/all_results.csv"
+INPUT_FILE = "kill_in.csv"
+JOURNAL_FILE = "public/Uploads/.checkpoints/kill_in.csv.journal"
+
+
+def seed_of(text):
+    return sum(map(ord, text))
+
+
+class StubAPI(BaseHTTPRequestHandler):
+    """Deterministic stand-in for the Florida UCC API: a name returns
+    seed % 4 debtors, each with one filing."""
+    requests = collections.Counter()
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        text = query.get("text", [""])[0]
+        row_number = query.get("rowNumber", [""])[0]
+        with self.lock:
+            self.requests[(url.path, text, row_number)] += 1
+        time.sleep(0.02)
+        if url.path == "/Search":
+            body = {"payload": {"debtors": [{"name": text, "rowNumber": i} for i in range(seed_of(text) % 4)]}}
+        else:
+            body = {"payload": {"status": "Filed", "fileDate": "2020-01-01T00:00:00Z",
+                                "uccNumber": f"{seed_of(text)}{row_number}",
+                                "secureds": [{"name": "STUB BANK"}], "debtors": [{"name": text}]}}
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the worker was killed mid-request
+
+
+def scratch_copy():
+    work_dir = tempfile.mkdtemp(prefix="verify_resume_")
+    for path in glob.glob(os.path.join(REPO, "*.py")) + glob.glob(os.path.join(REPO, "*.json")):
+        shutil.copy(path, work_dir)
+    return work_dir
+
+
+def worker_cmd(*prefix):
+    return [sys.executable, *prefix, "ucc_worker.py", INPUT_FILE, "--delay", "0", "--order", "file", "--job_id", "kill"]
+
+
+def read_rows(work_dir):
+    with open(os.path.join(work_dir, OUTPUT_FILE), newline='') as f:
+        return list(csv.reader(f))
+
+
+def verify_resume(names_count, seed, keep):
+    random.seed(seed)
+    work_dir = scratch_copy()
+    names = [f"KILLTEST COMPANY {i} LLC" for i in range(names_count)]
+    with open(os.path.join(work_dir, INPUT_FILE), "w", newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Business Name"])
+        writer.writerows([n] for n in names)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    env = dict(os.environ, UCC_API_BASE=f"http://127.0.0.1:{server.server_port}")
+    run = lambda cmd, **kw: subprocess.Popen(cmd, cwd=work_dir, env=env, stdout=subprocess.DEVNULL, **kw)
+
+    kills = 0
+    try:
+        while True:
+            p = run(worker_cmd())
+            try:
+                if p.wait(timeout=random.uniform(0.3, 2.0)) == 0:
+                    break
+            except subprocess.TimeoutExpired:
+                p.kill()
+                p.wait()
+                kills += 1
+
+        rows = read_rows(work_dir)
+        header, body = rows[0], rows[1:]
+        dups = [k for k, c in collections.Counter((r[0], r[6], r[2]) for r in body).items() if c > 1]
+        missing = set(names) - {r[0] for r in body}
+        expected = sum(max(1, seed_of(n) % 4) for n in names)
+        repeated = sum(c - 1 for c in StubAPI.requests.values())
+        journal_left = os.path.exists(os.path.join(work_dir, JOURNAL_FILE))
+
+        # A run killed after its last write but before clearing its journal:
+        # the rerun finds every name done and must still clear the journal
+        os.remove(os.path.join(work_dir, OUTPUT_FILE))
+        StubAPI.requests.clear()
+        run(worker_cmd("-c", "import os, sys, ucc_worker; sys.argv = sys.argv[1:]; "
+                             "ucc_worker.clear_checkpoint = lambda f: os._exit(3); ucc_worker.main()")).wait()
+        before = len(read_rows(work_dir))
+        calls = sum(StubAPI.requests.values())
+        run(worker_cmd()).wait()
+        rerun_ok = (len(read_rows(work_dir)) == before and sum(StubAPI.requests.values()) == calls
+                    and not os.path.exists(os.path.join(work_dir, JOURNAL_FILE)))
+    finally:
+        server.shutdown()
+        if not keep: shutil.rmtree(work_dir)
+
+    print(f"kills={kills} rows={len(body)} expected={expected} dups={len(dups)} missing={len(missing)} "
+          f"extra_headers={sum(r[0] == header[0] for r in body)} repeated_requests={repeated} "
+          f"journal_left={journal_left} rerun_ok={rerun_ok}")
+    return (len(body) == expected and not dups and not missing and header[0] == "Search Term"
+            and repeated <= kills and not journal_left and rerun_ok)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kill-and-resume check for the UCC worker journal")
+    parser.add_argument("--names", type=int, default=120, help="Names in the generated job")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the kill timings")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory for inspection")
+    args = parser.parse_args()
+    sys.exit(0 if verify_resume(args.names, args.seed, args.keep) else 1)